@@ -0,0 +1,50 @@
+"""
+Command-line maintenance tasks, available through ``flask --app app.main:create_app``.
+"""
+import json
+
+import click
+from flask import Flask
+
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.user_repository import UserRepository
+from app.services.import_service import ImportService, ColumnMapping
+
+
+@click.command('rebuild-rollups')
+@click.option('--user-id', type=int, default=None, help='Only rebuild rollups for this user.')
+def rebuild_rollups_command(user_id):
+    """Recompute the daily and monthly transaction rollups."""
+    TransactionRepository().rebuild_rollups(user_id)
+    scope = f"user {user_id}" if user_id is not None else "all users"
+    click.echo(f"Rebuilt transaction rollups for {scope}.")
+
+
+@click.command('import-transactions')
+@click.argument('username')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--mapping', default=None,
+              help='JSON object mapping transaction fields to CSV headers, e.g. \'{"amount": "Debit"}\'.')
+@click.option('--chunk-size', type=int, default=None, help='Rows inserted per transaction.')
+def import_transactions_command(username, csv_file, mapping, chunk_size):
+    """Import a CSV bank statement into USERNAME's transactions."""
+    user = UserRepository().get_by_username(username)
+    if user is None:
+        raise click.ClickException(f"No user named {username!r}")
+    
+    try:
+        column_mapping = ColumnMapping.from_dict(json.loads(mapping)) if mapping else None
+    except (ValueError, TypeError) as e:
+        raise click.ClickException(f"Invalid --mapping: {e}")
+    
+    result = ImportService().import_csv(user.id, csv_file, column_mapping, chunk_size)
+    for error in result.errors:
+        click.echo(f"line {error['line']}: {error['message']}", err=True)
+    click.echo(f"Imported {result.imported} transactions "
+               f"({result.duplicates} duplicates skipped, {result.failed} rows rejected).")
+
+
+def init_app(app: Flask):
+    """Register the CLI commands on the application."""
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(import_transactions_command)
@@ -5,10 +5,15 @@ from flask import Flask
 
 from config.settings import config
 from app.repositories.base import DatabaseInitializer
+from app.repositories import unit_of_work
+from app import cli
+from app.views import debug
 from app.views.auth_routes import auth_bp
 from app.views.main_routes import main_bp
 from app.views.transaction_routes import transaction_bp
 from app.views.budget_routes import budget_bp
+from app.views.metrics_routes import metrics_bp
+from app.views.admin_routes import admin_bp
 
 
 def create_app():
@@ -23,11 +28,22 @@ def create_app():
     db_initializer = DatabaseInitializer()
     db_initializer.initialize_database()
     
+    # Share one connection and one transaction per request
+    unit_of_work.init_app(app)
+    
+    # Time each request's SQL for Server-Timing and the debug toolbar
+    debug.init_app(app)
+    
+    # Register maintenance commands
+    cli.init_app(app)
+    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(transaction_bp)
     app.register_blueprint(budget_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admin_bp)
     
     return app
 
@@ -0,0 +1,167 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+"""
+import bisect
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Latency buckets in seconds, from a cached lookup to a slow page
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[Labels, float]
+
+
+@dataclass(frozen=True)
+class Metric:
+    """A metric family: name, kind ('counter', 'gauge' or 'histogram'), help and label names."""
+    name: str
+    kind: str
+    help: str
+    label_names: Tuple[str, ...] = ()
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+
+
+class _Stripe:
+    """One lock-protected slice of the recorded values."""
+    __slots__ = ('lock', 'counters', 'histograms')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        # (name, label values) -> [bucket counts..., sum, count]
+        self.histograms: Dict[Tuple[str, tuple], List[float]] = {}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms recorded from many threads, plus values read on
+    demand from collector callbacks.
+
+    Recording takes one of several striped locks, handed to threads round
+    robin, so concurrent requests rarely wait on each other; only ``render``
+    visits every stripe.
+    """
+
+    def __init__(self, stripes: int = 16):
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._next_stripe = itertools.count()
+        self._thread = threading.local()
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Tuple[Metric, Callable[[], Iterable[Sample]]]] = []
+
+    def counter(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> Metric:
+        return self._register(Metric(name, 'counter', help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Metric:
+        return self._register(Metric(name, 'histogram', help, label_names, tuple(buckets)))
+
+    def callback(self, name: str, kind: str, help: str,
+                 collect: Callable[[], Iterable[Sample]]) -> Metric:
+        """
+        Register a gauge or counter whose samples ``collect`` returns at
+        scrape time, for values that are already kept elsewhere.
+        """
+        metric = self._register(Metric(name, kind, help))
+        self._collectors.append((metric, collect))
+        return metric
+
+    def inc(self, metric: Metric, *label_values: str, amount: float = 1):
+        stripe = self._stripe()
+        key = (metric.name, label_values)
+        with stripe.lock:
+            stripe.counters[key] = stripe.counters.get(key, 0) + amount
+
+    def observe(self, metric: Metric, value: float, *label_values: str):
+        stripe = self._stripe()
+        key = (metric.name, label_values)
+        index = bisect.bisect_left(metric.buckets, value)
+        with stripe.lock:
+            counts = stripe.histograms.get(key)
+            if counts is None:
+                counts = stripe.histograms[key] = [0] * (len(metric.buckets) + 2)
+            if index < len(metric.buckets):
+                counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        counters: Dict[Tuple[str, tuple], float] = {}
+        histograms: Dict[Tuple[str, tuple], List[float]] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                for key, value in stripe.counters.items():
+                    counters[key] = counters.get(key, 0) + value
+                for key, counts in stripe.histograms.items():
+                    merged = histograms.setdefault(key, [0] * len(counts))
+                    for i, count in enumerate(counts):
+                        merged[i] += count
+        collected = {metric.name: list(collect()) for metric, collect in self._collectors}
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.name in collected:
+                for labels, value in collected[metric.name]:
+                    lines.append(f"{metric.name}{_labels(labels)} {_number(value)}")
+            elif metric.kind == 'counter':
+                for (name, values), value in sorted(counters.items()):
+                    if name == metric.name:
+                        lines.append(f"{name}{_labels(zip(metric.label_names, values))} {_number(value)}")
+            elif metric.kind == 'histogram':
+                for (name, values), counts in sorted(histograms.items()):
+                    if name != metric.name:
+                        continue
+                    labels = list(zip(metric.label_names, values))
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', _number(bound))])} {_number(cumulative)}")
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', '+Inf')])} {_number(counts[-1])}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(counts[-2])}")
+                    lines.append(f"{name}_count{_labels(labels)} {_number(counts[-1])}")
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric: Metric) -> Metric:
+        # Registering the same name again returns the first definition
+        return self._metrics.setdefault(metric.name, metric)
+
+    def _stripe(self) -> _Stripe:
+        # Thread idents are aligned addresses, so they cannot pick a stripe themselves
+        stripe = getattr(self._thread, 'stripe', None)
+        if stripe is None:
+            stripe = self._thread.stripe = self._stripes[next(self._next_stripe) % len(self._stripes)]
+        return stripe
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ''
+    escaped = (f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+# Shared by the whole process
+metrics = MetricsRegistry()
+
+request_duration = metrics.histogram(
+    'finance_request_duration_seconds', 'Request latency by endpoint, method and status.',
+    ('endpoint', 'method', 'status'))
+repository_call_duration = metrics.histogram(
+    'finance_repository_call_duration_seconds', 'Repository method latency.', ('repository', 'method'))
+repository_errors = metrics.counter(
+    'finance_repository_errors_total', 'Repository method calls that raised.', ('repository', 'method'))
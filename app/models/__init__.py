@@ -1,18 +1,89 @@
 """
 Data models for the Finance Tracker application.
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Optional, List
 from enum import Enum
 
 
+def slotted(cls):
+    """
+    Rebuild a dataclass with ``__slots__`` instead of a per-instance ``__dict__``.
+    
+    Equivalent to ``@dataclass(slots=True)``, which needs Python 3.10.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a stored ``CURRENT_TIMESTAMP`` value, tolerating legacy junk."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_CENT = Decimal('0.01')
+
+# Largest amount SQLite can store: cents are a signed 64-bit INTEGER
+MAX_CENTS = 2 ** 63 - 1
+
+
+def to_cents(amount: float) -> int:
+    """
+    Convert a currency amount to integer minor units (cents), as stored.
+
+    The amount is rounded as written in decimal, halves away from zero, so
+    1.005 is 101 cents even though the float is slightly below 1.005.
+
+    Raises:
+        ValueError: if the amount is not finite or does not fit in ``MAX_CENTS``
+    """
+    try:
+        cents = int(Decimal(str(amount)).quantize(_CENT, ROUND_HALF_UP) * 100)
+    except (InvalidOperation, OverflowError, ValueError):
+        raise ValueError(f"Amount {amount} cannot be stored") from None
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f"Amount {amount} cannot be stored")
+    return cents
+
+
+def from_cents(cents: int) -> float:
+    """Convert stored integer minor units back to a currency amount."""
+    return cents / 100
+
+
 class TransactionType(Enum):
     """Enumeration for transaction types."""
     INCOME = "income"
     EXPENSE = "expense"
 
 
+class TransactionSort(Enum):
+    """Sort orders for transaction queries."""
+    DATE_DESC = "date_desc"
+    DATE_ASC = "date_asc"
+    AMOUNT_DESC = "amount_desc"
+    AMOUNT_ASC = "amount_asc"
+
+
+class Granularity(Enum):
+    """Bucket sizes for spending time series."""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+
 class BudgetPeriod(Enum):
     """Enumeration for budget periods."""
     WEEKLY = "weekly"
@@ -21,6 +92,18 @@ class BudgetPeriod(Enum):
     CUSTOM = "custom"
 
 
+# Value -> member lookups; plain dict access is much cheaper than Enum(value)
+_TRANSACTION_TYPES = {member.value: member for member in TransactionType}
+_BUDGET_PERIODS = {member.value: member for member in BudgetPeriod}
+
+# Column order expected by Transaction.from_row and Budget.from_row
+TRANSACTION_COLUMNS = ('id', 'user_id', 'amount_cents', 'category', 'date', 'description',
+                       'payment_method', 'transaction_type', 'created_at', 'content_hash')
+BUDGET_COLUMNS = ('id', 'user_id', 'category', 'allocated_cents', 'period',
+                  'start_date', 'end_date', 'created_at')
+
+
+@slotted
 @dataclass
 class User:
     """User model."""
@@ -36,6 +119,7 @@ class User:
             self.created_at = datetime.now()
 
 
+@slotted
 @dataclass
 class Category:
     """Category model."""
@@ -50,6 +134,7 @@ class Category:
             self.created_at = datetime.now()
 
 
+@slotted
 @dataclass
 class Transaction:
     """Transaction model."""
@@ -62,6 +147,7 @@ class Transaction:
     payment_method: str = ""
     transaction_type: TransactionType = TransactionType.EXPENSE
     created_at: Optional[datetime] = None
+    content_hash: Optional[str] = None
     
     def __post_init__(self):
         if self.created_at is None:
@@ -69,6 +155,24 @@ class Transaction:
         if isinstance(self.transaction_type, str):
             self.transaction_type = TransactionType(self.transaction_type)
     
+    @classmethod
+    def from_row(cls, row) -> 'Transaction':
+        """
+        Build a Transaction from a trusted database row, skipping ``__post_init__``.
+        
+        ``row`` is positional, in ``TRANSACTION_COLUMNS`` order, with the
+        amount in cents. Rows written before transaction types existed are
+        expenses.
+        """
+        transaction = cls.__new__(cls)
+        (transaction.id, transaction.user_id, amount_cents, transaction.category,
+         transaction.date, transaction.description, transaction.payment_method,
+         transaction_type, created_at, transaction.content_hash) = row
+        transaction.amount = from_cents(amount_cents)
+        transaction.transaction_type = _TRANSACTION_TYPES.get(transaction_type, TransactionType.EXPENSE)
+        transaction.created_at = parse_timestamp(created_at)
+        return transaction
+    
     @property
     def is_income(self) -> bool:
         """Check if transaction is income."""
@@ -80,6 +184,7 @@ class Transaction:
         return self.transaction_type == TransactionType.EXPENSE
 
 
+@slotted
 @dataclass
 class Budget:
     """Budget model."""
@@ -97,8 +202,25 @@ class Budget:
             self.created_at = datetime.now()
         if isinstance(self.period, str):
             self.period = BudgetPeriod(self.period)
+    
+    @classmethod
+    def from_row(cls, row) -> 'Budget':
+        """
+        Build a Budget from a trusted database row, skipping ``__post_init__``.
+        
+        ``row`` is positional, in ``BUDGET_COLUMNS`` order, with the
+        allocation in cents.
+        """
+        budget = cls.__new__(cls)
+        (budget.id, budget.user_id, budget.category, allocated_cents,
+         period, budget.start_date, budget.end_date, created_at) = row[:8]
+        budget.allocated_amount = from_cents(allocated_cents)
+        budget.period = _BUDGET_PERIODS[period]
+        budget.created_at = parse_timestamp(created_at)
+        return budget
 
 
+@slotted
 @dataclass
 class BudgetAnalytics:
     """Budget analytics model for tracking spending against budgets."""
@@ -115,6 +237,7 @@ class BudgetAnalytics:
         self.is_overspent = self.spent_amount > self.budget.allocated_amount
 
 
+@slotted
 @dataclass
 class FinancialSummary:
     """Financial summary model."""
@@ -126,4 +249,50 @@ class FinancialSummary:
     expense_by_payment_method: dict = field(default_factory=dict)
     
     def __post_init__(self):
-        self.net_balance = self.total_income - self.total_expense
\ No newline at end of file
+        self.net_balance = self.total_income - self.total_expense
+
+
+@slotted
+@dataclass
+class TransactionFilter:
+    """Criteria for querying a user's transactions; empty criteria match everything."""
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    categories: List[str] = field(default_factory=list)
+    payment_methods: List[str] = field(default_factory=list)
+    transaction_type: Optional[TransactionType] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    sort: TransactionSort = TransactionSort.DATE_DESC
+
+
+@slotted
+@dataclass
+class TransactionPage:
+    """One page of a keyset-paginated transaction listing."""
+    transactions: List[Transaction] = field(default_factory=list)
+    next_page_token: Optional[str] = None
+    
+    @property
+    def has_more(self) -> bool:
+        """Check if another page follows this one."""
+        return self.next_page_token is not None
+
+
+@slotted
+@dataclass
+class ImportResult:
+    """Outcome of a transaction import."""
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+
+@slotted
+@dataclass
+class TransactionSearchHit:
+    """A full-text search match: the transaction, a description snippet and its rank."""
+    transaction: Transaction
+    snippet: str = ""
+    rank: float = 0.0
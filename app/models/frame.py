@@ -0,0 +1,152 @@
+"""
+Columnar, array-backed view of a user's transactions for analytics.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models import TransactionType, from_cents
+
+
+@dataclass
+class TransactionFrame:
+    """
+    A user's transactions as parallel NumPy arrays, one entry per
+    (day, category, payment method, type) group.
+
+    Dates are ``datetime64[D]`` (whole days), amounts are int64 cents with
+    their row counts, and the string columns are dictionary-encoded: each
+    ``*_codes`` array indexes into the matching tuple of distinct values.
+    Analytics are vectorized masks and integer group-bys over these arrays
+    instead of Python loops over rows; sums stay exact in cents and are only
+    converted to currency amounts on the way out.
+    """
+    days: np.ndarray
+    cents: np.ndarray
+    counts: np.ndarray
+    category_codes: np.ndarray
+    categories: Tuple[str, ...]
+    method_codes: np.ndarray
+    methods: Tuple[str, ...]
+    type_codes: np.ndarray
+    types: Tuple[TransactionType, ...]
+
+    @classmethod
+    def from_encoded(cls, days: List[str], category_ids: List[int], category_names: Dict[int, str],
+                     method_ids: List[int], method_names: Dict[int, str], types: List[str],
+                     cents: List[int], counts: List[int]) -> 'TransactionFrame':
+        """
+        Build a frame from columns that are already dictionary-encoded as
+        database IDs, with ID -> name dicts for the dictionaries.
+        """
+        category_values, category_codes = _compact(category_ids, category_names)
+        method_values, method_codes = _compact(method_ids, method_names)
+        type_values, type_codes = _encode(types)
+        return cls(
+            days=_parse_days(days),
+            cents=np.asarray(cents, dtype=np.int64),
+            counts=np.asarray(counts, dtype=np.int64),
+            category_codes=category_codes,
+            categories=category_values,
+            method_codes=method_codes,
+            methods=method_values,
+            type_codes=type_codes,
+            types=tuple(TransactionType(value) for value in type_values),
+        )
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    def mask(self, transaction_type: TransactionType = None, category: str = None,
+             start_date: str = None, end_date: str = None) -> np.ndarray:
+        """Boolean row mask; every filter left as None matches everything."""
+        selected = np.ones(len(self), dtype=bool)
+        if transaction_type is not None:
+            selected &= self.type_codes == _code(self.types, transaction_type)
+        if category is not None:
+            selected &= self.category_codes == _code(self.categories, category)
+        # A bound that is not an ISO date (legacy budgets) leaves that side open
+        start = _parse_day(start_date) if start_date else None
+        if start is not None and not np.isnat(start):
+            selected &= self.days >= start
+        end = _parse_day(end_date) if end_date else None
+        if end is not None and not np.isnat(end):
+            selected &= self.days <= end
+        return selected
+
+    def total(self, mask: np.ndarray = None) -> float:
+        """Sum of amounts, optionally over a mask."""
+        cents = self.cents if mask is None else self.cents[mask]
+        return from_cents(int(cents.sum()))
+
+    def totals_by_category(self, mask: np.ndarray = None) -> Dict[str, float]:
+        """Amount totals per category, for categories present under the mask."""
+        return self._totals_by(self.category_codes, self.categories, mask)
+
+    def totals_by_method(self, mask: np.ndarray = None) -> Dict[str, float]:
+        """Amount totals per payment method, for methods present under the mask."""
+        return self._totals_by(self.method_codes, self.methods, mask)
+
+    def window_totals(self, windows: Iterable[Tuple[str, str, Optional[str]]],
+                      transaction_type: TransactionType = TransactionType.EXPENSE) -> List[float]:
+        """
+        Totals for each (category, start_date, end_date) window.
+
+        An empty or missing end date leaves the window open-ended, as budgets do.
+        """
+        by_type = self.mask(transaction_type=transaction_type)
+        return [
+            self.total(by_type & self.mask(category=category, start_date=start, end_date=end))
+            for category, start, end in windows
+        ]
+
+    def _totals_by(self, codes: np.ndarray, values: tuple, mask: Optional[np.ndarray]) -> dict:
+        cents = self.cents
+        if mask is not None:
+            codes, cents = codes[mask], cents[mask]
+        totals = _group_sum(codes, cents, len(values))
+        present = np.bincount(codes, minlength=len(values)) > 0
+        return {values[code]: from_cents(int(totals[code])) for code in np.flatnonzero(present)}
+
+
+def _group_sum(codes: np.ndarray, cents: np.ndarray, size: int) -> np.ndarray:
+    """Exact int64 sums of ``cents`` per code (``bincount`` would go through float64)."""
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, codes, cents)
+    return totals
+
+
+def _encode(values: List[str]) -> Tuple[tuple, np.ndarray]:
+    """Dictionary-encode a column as (distinct values, int32 codes)."""
+    distinct, codes = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+    return tuple(distinct.tolist()), codes.astype(np.int32)
+
+
+def _compact(ids: List[int], names: Dict[int, str]) -> Tuple[tuple, np.ndarray]:
+    """Re-encode sparse database IDs as dense codes, with the matching names."""
+    distinct, codes = np.unique(np.asarray(ids, dtype=np.int64), return_inverse=True)
+    return tuple(names[value] for value in distinct.tolist()), codes.astype(np.int32)
+
+
+def _code(values: tuple, value) -> int:
+    """Code of a value in a dictionary, or -1 (matching no row) when absent."""
+    try:
+        return values.index(value)
+    except ValueError:
+        return -1
+
+
+def _parse_days(days: List[str]) -> np.ndarray:
+    """Parse ISO dates to datetime64[D]; unparseable legacy values become NaT."""
+    try:
+        return np.asarray(days, dtype='datetime64[D]')
+    except ValueError:
+        return np.array([_parse_day(day) for day in days], dtype='datetime64[D]')
+
+
+def _parse_day(day: str) -> np.datetime64:
+    try:
+        return np.datetime64(day, 'D')
+    except ValueError:
+        return np.datetime64('NaT')
@@ -0,0 +1,160 @@
+"""
+Opt-in per-request memory and CPU profiling.
+
+A profiled request runs under ``tracemalloc`` and ``cProfile``. The profile
+has the peak traced memory during the request, the source lines holding the
+most memory that is still allocated when it ends, and a call profile.
+tracemalloc keeps no record of what was live at the peak, so memory that was
+allocated and freed during the request counts towards the peak but does not
+appear among the retained lines.
+Results are kept in memory, a bounded number per endpoint.
+"""
+import cProfile
+import io
+import itertools
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# tracemalloc is process-wide, so only one request is profiled at a time
+_profiling_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+@dataclass
+class AllocationSite:
+    """Memory allocated by one source line during a request and still held at its end."""
+    location: str
+    size_bytes: int
+    count: int
+
+
+@dataclass
+class RequestProfile:
+    """What one profiled request allocated and spent its time on."""
+    id: int
+    endpoint: str
+    path: str
+    method: str
+    started_at: datetime
+    duration: float
+    peak_bytes: int
+    retained_bytes: int
+    retained_allocations: List[AllocationSite] = field(default_factory=list)
+    call_profile: str = ""
+
+
+class RequestProfiler:
+    """Profiles the code run between ``start`` and ``stop`` on one thread."""
+
+    def __init__(self, frames: int = 10, top: int = 25):
+        self.frames = frames
+        self.top = top
+        self._started_tracing = False
+        self._profile: Optional[cProfile.Profile] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._base_memory = 0
+        self._started = 0.0
+
+    @classmethod
+    def try_start(cls, frames: int = 10, top: int = 25) -> Optional['RequestProfiler']:
+        """Start profiling, or return None if another request is being profiled."""
+        if not _profiling_lock.acquire(blocking=False):
+            return None
+        profiler = cls(frames, top)
+        try:
+            profiler._start()
+        except Exception:
+            _profiling_lock.release()
+            raise
+        return profiler
+
+    def _start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._baseline = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self._base_memory = tracemalloc.get_traced_memory()[0]
+        self._profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self, endpoint: str, path: str, method: str) -> RequestProfile:
+        """Stop profiling and summarize what was recorded."""
+        try:
+            self._profile.disable()
+            duration = time.perf_counter() - self._started
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            differences = snapshot.filter_traces(filters).compare_to(
+                self._baseline.filter_traces(filters), 'lineno')
+            growth = [d for d in differences if d.size_diff > 0]
+            top = [
+                AllocationSite(location=f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                               size_bytes=d.size_diff, count=d.count_diff)
+                for d in growth[:self.top]
+            ]
+
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).strip_dirs().sort_stats('cumulative').print_stats(self.top)
+
+            return RequestProfile(
+                id=next(_ids),
+                endpoint=endpoint,
+                path=path,
+                method=method,
+                started_at=datetime.now(),
+                duration=duration,
+                # Peak memory above what was already allocated when the request began
+                peak_bytes=peak - self._base_memory,
+                retained_bytes=sum(d.size_diff for d in growth),
+                retained_allocations=top,
+                call_profile=stream.getvalue(),
+            )
+        finally:
+            _profiling_lock.release()
+
+
+class ProfileStore:
+    """The most recent profiles of every endpoint."""
+
+    def __init__(self, per_endpoint: int = 20):
+        self.per_endpoint = per_endpoint
+        self._profiles: Dict[str, deque] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            profiles = self._profiles.setdefault(profile.endpoint, deque(maxlen=self.per_endpoint))
+            profiles.append(profile)
+
+    def by_endpoint(self) -> List[Tuple[str, List[RequestProfile]]]:
+        """(endpoint, profiles newest first), endpoints by name."""
+        with self._lock:
+            return [(endpoint, list(reversed(profiles))) for endpoint, profiles in sorted(self._profiles.items())]
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        with self._lock:
+            for profiles in self._profiles.values():
+                for profile in profiles:
+                    if profile.id == profile_id:
+                        return profile
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+# Shared by the whole process
+profile_store = ProfileStore()
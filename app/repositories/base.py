@@ -1,31 +1,111 @@
 """
 Base repository interface and database initialization.
 """
+import collections.abc
+import functools
+import inspect
 import sqlite3
+import time
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, List, Optional
+from typing import TypeVar, Generic, Iterator, List, Optional
 from contextlib import contextmanager
 
 from config.settings import config
+from app.metrics import metrics, repository_call_duration, repository_errors
+from app.repositories.migrations import MigrationRunner
+from app.repositories.pool import get_pool
+from app.repositories.unit_of_work import current_unit_of_work
 
 T = TypeVar('T')
 
 
 class Repository(ABC, Generic[T]):
-    """Abstract base repository class."""
+    """
+    Abstract base repository class.
+    
+    Every public method a subclass defines is timed into the repository
+    call metrics (see ``app.metrics``).
+    """
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, member in list(vars(cls).items()):
+            if not name.startswith('_') and inspect.isfunction(member):
+                setattr(cls, name, _timed(cls.__name__, name, member))
     
     def __init__(self, db_path: str = None):
         self.db_path = db_path or config.database.connection_string
     
     @contextmanager
     def get_connection(self):
-        """Get database connection with automatic cleanup."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
-        try:
+        """
+        Get a database connection for the duration of the block.
+
+        Inside a request this is the unit of work's connection and writes are
+        committed once when the request finishes. Elsewhere a pooled connection
+        is borrowed and committed when the block exits cleanly.
+        """
+        uow = current_unit_of_work()
+        if uow is not None:
+            yield uow.connection(self.db_path)
+            return
+
+        with get_pool(self.db_path).connection() as conn:
             yield conn
-        finally:
-            conn.close()
+            if conn.in_transaction:
+                conn.commit()
+    
+    def commit(self):
+        """
+        Commit the request's pending writes now instead of at the end.
+        
+        Outside a request every ``get_connection`` block already commits on
+        exit, so this only matters for long batch jobs inside a request.
+        """
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.commit()
+    
+    @contextmanager
+    def _savepoint(self, conn: sqlite3.Connection, name: str = 'batch'):
+        """
+        Undo the block's writes if it raises, leaving earlier writes of the
+        enclosing transaction (such as the request's unit of work) in place.
+        """
+        if not conn.in_transaction:
+            # Otherwise the SAVEPOINT would open the transaction and RELEASE commit it
+            conn.execute("BEGIN")
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        conn.execute(f"RELEASE {name}")
+    
+    def _iter_rows(self, sql: str, params: tuple = (), batch_size: int = None,
+                   tuples: bool = False) -> Iterator[sqlite3.Row]:
+        """
+        Lazily yield the rows of a query, fetched ``batch_size`` at a time.
+        
+        With ``tuples`` rows are plain tuples rather than ``sqlite3.Row``,
+        which is cheaper when they are mapped positionally.
+        
+        The connection stays checked out until the iterator is exhausted or
+        closed, so consume it promptly (or wrap it in ``contextlib.closing``).
+        """
+        batch_size = batch_size or config.database.fetch_batch_size
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if tuples:
+                cursor.row_factory = None
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
     
     @abstractmethod
     def create(self, entity: T) -> T:
@@ -53,6 +133,38 @@ class Repository(ABC, Generic[T]):
         pass
 
 
+def _timed(repository: str, method: str, func):
+    """
+    Wrap a repository method to record its latency. Methods that return an
+    iterator (generators or lazy generator expressions) are timed until it
+    is exhausted or closed, since that is when their queries actually run.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            metrics.inc(repository_errors, repository, method)
+            metrics.observe(repository_call_duration, time.perf_counter() - started, repository, method)
+            raise
+        if isinstance(result, collections.abc.Iterator):
+            return _timed_iteration(repository, method, result, started)
+        metrics.observe(repository_call_duration, time.perf_counter() - started, repository, method)
+        return result
+    return wrapper
+
+
+def _timed_iteration(repository: str, method: str, iterator: Iterator, started: float):
+    try:
+        yield from iterator
+    except Exception:
+        metrics.inc(repository_errors, repository, method)
+        raise
+    finally:
+        metrics.observe(repository_call_duration, time.perf_counter() - started, repository, method)
+
+
 class DatabaseInitializer:
     """Handles database schema initialization."""
     
@@ -60,88 +172,12 @@ class DatabaseInitializer:
         self.db_path = db_path or config.database.connection_string
     
     def initialize_database(self):
-        """Initialize the database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Users table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    email TEXT NOT NULL UNIQUE,
-                    phone TEXT NOT NULL,
-                    password TEXT NOT NULL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Categories table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    color TEXT DEFAULT '#007bff',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id),
-                    UNIQUE(user_id, name)
-                )
-            ''')
-            
-            # Transactions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    amount REAL NOT NULL,
-                    category TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    description TEXT,
-                    payment_method TEXT NOT NULL,
-                    transaction_type TEXT DEFAULT 'expense',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            ''')
-            
-            # Budgets table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS budgets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    category TEXT NOT NULL,
-                    allocated_amount REAL NOT NULL,
-                    period TEXT NOT NULL DEFAULT 'monthly',
-                    start_date TEXT NOT NULL,
-                    end_date TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id),
-                    UNIQUE(user_id, category)
-                )
-            ''')
-            
-            # Run migrations
-            self._run_migrations(cursor)
-            
-            conn.commit()
-    
-    def _run_migrations(self, cursor):
-        """Run database migrations for schema updates."""
-        # Check if transaction_type column exists, if not add it
-        cursor.execute("PRAGMA table_info(transactions)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'transaction_type' not in columns:
-            print("Adding transaction_type column to transactions table...")
-            cursor.execute('ALTER TABLE transactions ADD COLUMN transaction_type TEXT DEFAULT "expense"')
-            print("Migration completed: Added transaction_type column")
-        
-        # Check if created_at column exists in transactions, if not add it
-        if 'created_at' not in columns:
-            print("Adding created_at column to transactions table...")
-            cursor.execute('ALTER TABLE transactions ADD COLUMN created_at TEXT DEFAULT CURRENT_TIMESTAMP')
-            print("Migration completed: Added created_at column")
+        """Bring the database schema up to date."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            MigrationRunner(conn).run()
+        finally:
+            conn.close()
 
 
 # Initialize database on module import
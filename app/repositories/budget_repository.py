@@ -3,25 +3,34 @@ Budget repository implementation.
 """
 from typing import Optional, List
 
-from app.models import Budget, BudgetPeriod
+from app.models import Budget, BUDGET_COLUMNS, to_cents
 from app.repositories.base import Repository
+from app.repositories.category_repository import CategoryRepository
+
+# Budget.from_row columns; the category name comes from categories (aliased c)
+_COLUMNS = ', '.join('c.name' if column == 'category' else 'b.' + column for column in BUDGET_COLUMNS)
+_SELECT = f"SELECT {_COLUMNS} FROM budgets b JOIN categories c ON c.id = b.category_id"
 
 
 class BudgetRepository(Repository[Budget]):
-    """Repository for budget operations."""
+    """Repository for budget operations; categories are stored by ID."""
+    
+    def __init__(self, db_path: str = None):
+        super().__init__(db_path)
+        self.categories = CategoryRepository(self.db_path)
     
     def create(self, budget: Budget) -> Budget:
         """Create a new budget."""
+        category_id = self.categories.resolve_ids(budget.user_id, [budget.category])[budget.category]
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """INSERT INTO budgets 
-                   (user_id, category, allocated_amount, period, start_date, end_date) 
+                   (user_id, category_id, allocated_cents, period, start_date, end_date) 
                    VALUES (?, ?, ?, ?, ?, ?)""",
-                (budget.user_id, budget.category, budget.allocated_amount,
+                (budget.user_id, category_id, to_cents(budget.allocated_amount),
                  budget.period.value, budget.start_date, budget.end_date)
             )
-            conn.commit()
             budget.id = cursor.lastrowid
             return budget
     
@@ -29,7 +38,7 @@ class BudgetRepository(Repository[Budget]):
         """Get budget by ID."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM budgets WHERE id = ?", (budget_id,))
+            cursor.execute(f"{_SELECT} WHERE b.id = ?", (budget_id,))
             row = cursor.fetchone()
             
             if row:
@@ -40,7 +49,7 @@ class BudgetRepository(Repository[Budget]):
         """Get all budgets."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM budgets ORDER BY created_at DESC")
+            cursor.execute(f"{_SELECT} ORDER BY b.created_at DESC")
             rows = cursor.fetchall()
             return [self._row_to_budget(row) for row in rows]
     
@@ -49,7 +58,7 @@ class BudgetRepository(Repository[Budget]):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT * FROM budgets WHERE user_id = ? ORDER BY created_at DESC",
+                f"{_SELECT} WHERE b.user_id = ? ORDER BY b.created_at DESC",
                 (user_id,)
             )
             rows = cursor.fetchall()
@@ -57,11 +66,14 @@ class BudgetRepository(Repository[Budget]):
     
     def get_by_category(self, user_id: int, category: str) -> Optional[Budget]:
         """Get budget by user and category."""
+        category_id = self.categories.get_id(user_id, category)
+        if category_id is None:
+            return None
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT * FROM budgets WHERE user_id = ? AND category = ?",
-                (user_id, category)
+                f"{_SELECT} WHERE b.user_id = ? AND b.category_id = ?",
+                (user_id, category_id)
             )
             row = cursor.fetchone()
             
@@ -74,12 +86,11 @@ class BudgetRepository(Repository[Budget]):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """UPDATE budgets SET allocated_amount = ?, period = ?, 
+                """UPDATE budgets SET allocated_cents = ?, period = ?, 
                    start_date = ?, end_date = ? WHERE id = ?""",
-                (budget.allocated_amount, budget.period.value,
+                (to_cents(budget.allocated_amount), budget.period.value,
                  budget.start_date, budget.end_date, budget.id)
             )
-            conn.commit()
             return budget
     
     def update_allocation(self, budget_id: int, allocated_amount: float) -> bool:
@@ -87,10 +98,19 @@ class BudgetRepository(Repository[Budget]):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "UPDATE budgets SET allocated_amount = ? WHERE id = ?",
-                (allocated_amount, budget_id)
+                "UPDATE budgets SET allocated_cents = ? WHERE id = ?",
+                (to_cents(allocated_amount), budget_id)
+            )
+            return cursor.rowcount > 0
+    
+    def update_allocation_for_user(self, budget_id: int, user_id: int, allocated_amount: float) -> bool:
+        """Update budget allocation amount only if the budget belongs to the given user."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE budgets SET allocated_cents = ? WHERE id = ? AND user_id = ?",
+                (to_cents(allocated_amount), budget_id, user_id)
             )
-            conn.commit()
             return cursor.rowcount > 0
     
     def delete(self, budget_id: int) -> bool:
@@ -98,28 +118,31 @@ class BudgetRepository(Repository[Budget]):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM budgets WHERE id = ?", (budget_id,))
-            conn.commit()
+            return cursor.rowcount > 0
+    
+    def delete_for_user(self, budget_id: int, user_id: int) -> bool:
+        """Delete budget only if it belongs to the given user."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM budgets WHERE id = ? AND user_id = ?",
+                (budget_id, user_id)
+            )
             return cursor.rowcount > 0
     
     def delete_by_user_and_category(self, user_id: int, category: str) -> bool:
         """Delete budget by user and category."""
+        category_id = self.categories.get_id(user_id, category)
+        if category_id is None:
+            return False
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "DELETE FROM budgets WHERE user_id = ? AND category = ?",
-                (user_id, category)
+                "DELETE FROM budgets WHERE user_id = ? AND category_id = ?",
+                (user_id, category_id)
             )
-            conn.commit()
             return cursor.rowcount > 0
     
     def _row_to_budget(self, row) -> Budget:
         """Convert database row to Budget object."""
-        return Budget(
-            id=row['id'],
-            user_id=row['user_id'],
-            category=row['category'],
-            allocated_amount=row['allocated_amount'],
-            period=BudgetPeriod(row['period']),
-            start_date=row['start_date'],
-            end_date=row['end_date']
-        )
\ No newline at end of file
+        return Budget.from_row(tuple(row))
@@ -0,0 +1,253 @@
+"""
+Category and payment-method repository implementation.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import config
+from app.models import Category, parse_timestamp
+from app.repositories.base import Repository
+from app.repositories.unit_of_work import current_unit_of_work
+
+
+class LookupCache:
+    """
+    Thread-safe, size-bounded LRU of name -> ID lookups.
+
+    Only committed rows are ever cached, so a rolled-back insert can never
+    leave an ID behind that does not exist.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def update(self, items: Dict[tuple, int]):
+        with self._lock:
+            self._entries.update(items)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def discard_user(self, db_path: str, user_id: int):
+        """Forget every category lookup of one user."""
+        with self._lock:
+            for key in [key for key in self._entries if key[:3] == (db_path, 'category', user_id)]:
+                del self._entries[key]
+
+
+# Shared by every repository instance in the process
+_lookups = LookupCache(config.database.lookup_cache_size)
+
+
+def lookup_cache_stats() -> dict:
+    """Hits, misses and entries of the process-wide name -> ID lookup cache."""
+    return _lookups.stats()
+
+
+class CategoryRepository(Repository[Category]):
+    """
+    Repository for the per-user ``categories`` and the shared
+    ``payment_methods`` dictionaries.
+
+    Transactions and budgets reference both by integer ID; the ``resolve_*``
+    methods translate names to IDs through an in-process cache, creating
+    entries that do not exist yet.
+    """
+
+    def create(self, category: Category) -> Category:
+        """Create a new category."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO categories (user_id, name, color) VALUES (?, ?, ?)",
+                (category.user_id, category.name, category.color)
+            )
+            category.id = cursor.lastrowid
+            return category
+
+    def get_by_id(self, category_id: int) -> Optional[Category]:
+        """Get category by ID."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM categories WHERE id = ?", (category_id,))
+            row = cursor.fetchone()
+
+            if row:
+                return self._row_to_category(row)
+            return None
+
+    def get_all(self) -> List[Category]:
+        """Get all categories."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM categories ORDER BY user_id, name")
+            return [self._row_to_category(row) for row in cursor.fetchall()]
+
+    def get_by_user_id(self, user_id: int) -> List[Category]:
+        """Get all categories of a user, by name."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM categories WHERE user_id = ? ORDER BY name", (user_id,))
+            return [self._row_to_category(row) for row in cursor.fetchall()]
+
+    def get_names(self, user_id: int) -> Dict[int, str]:
+        """Get a user's categories as an ID -> name dict."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM categories WHERE user_id = ?", (user_id,))
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def get_payment_method_names(self) -> Dict[int, str]:
+        """Get every payment method as an ID -> name dict."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM payment_methods")
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def update(self, category: Category) -> Category:
+        """Update category name and color."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE categories SET name = ?, color = ? WHERE id = ?",
+                (category.name, category.color, category.id)
+            )
+        self._forget_user(category.user_id)
+        return category
+
+    def rename(self, user_id: int, old_name: str, new_name: str) -> bool:
+        """
+        Rename one of a user's categories.
+
+        Transactions and budgets reference the category by ID, so this is a
+        single-row UPDATE however many of them use it.
+
+        Raises:
+            sqlite3.IntegrityError: if the user already has ``new_name``
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE categories SET name = ? WHERE user_id = ? AND name = ?",
+                (new_name, user_id, old_name)
+            )
+            renamed = cursor.rowcount > 0
+        self._forget_user(user_id)
+        return renamed
+
+    def delete(self, category_id: int) -> bool:
+        """Delete category by ID, unless transactions or budgets still use it."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """DELETE FROM categories WHERE id = ?
+                   AND NOT EXISTS (SELECT 1 FROM transactions WHERE category_id = categories.id)
+                   AND NOT EXISTS (SELECT 1 FROM budgets WHERE category_id = categories.id)
+                   RETURNING user_id""",
+                (category_id,)
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return False
+        # A re-created category gets a new ID; the cached one must not outlive the row
+        self._forget_user(row[0])
+        return True
+
+    def get_id(self, user_id: int, name: str) -> Optional[int]:
+        """Get the ID of a user's category by name, without creating it."""
+        return self._resolve('category', user_id, [name], create=False).get(name)
+
+    def resolve_ids(self, user_id: int, names: Iterable[str]) -> Dict[str, int]:
+        """Get name -> ID for a user's categories, creating any that are missing."""
+        return self._resolve('category', user_id, names, create=True)
+
+    def get_ids(self, user_id: int, names: Iterable[str]) -> Dict[str, int]:
+        """Get name -> ID for those of the given categories the user has."""
+        return self._resolve('category', user_id, names, create=False)
+
+    def get_payment_method_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Get name -> ID for those of the given payment methods that exist."""
+        return self._resolve('payment_method', None, names, create=False)
+
+    def resolve_payment_method_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Get name -> ID for payment methods, creating any that are missing."""
+        return self._resolve('payment_method', None, names, create=True)
+
+    def _resolve(self, kind: str, user_id: Optional[int], names: Iterable[str],
+                 create: bool) -> Dict[str, int]:
+        scope = (self.db_path, kind, user_id)
+        ids, missing = {}, []
+        for name in set(names):
+            cached = _lookups.get(scope + (name,))
+            if cached is None:
+                missing.append(name)
+            else:
+                ids[name] = cached
+        if not missing:
+            return ids
+
+        if kind == 'category':
+            table, where, params = 'categories', 'user_id = ? AND ', [user_id]
+            insert = "INSERT INTO categories (user_id, name) VALUES (?, ?) ON CONFLICT (user_id, name) DO NOTHING"
+            rows = [(user_id, name) for name in missing]
+        else:
+            table, where, params = 'payment_methods', '', []
+            insert = "INSERT INTO payment_methods (name) VALUES (?) ON CONFLICT (name) DO NOTHING"
+            rows = [(name,) for name in missing]
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if create:
+                cursor.executemany(insert, rows)
+            cursor.execute(
+                f"SELECT name, id FROM {table} WHERE {where}name IN ({', '.join('?' * len(missing))})",
+                params + missing
+            )
+            found = {row[0]: row[1] for row in cursor.fetchall()}
+
+        # Inside a request the rows may still be uncommitted; a later lookup caches them
+        if not conn.in_transaction:
+            _lookups.update({scope + (name,): found_id for name, found_id in found.items()})
+        ids.update(found)
+        return ids
+
+    def _forget_user(self, user_id: int):
+        """
+        Drop a user's cached lookups after changing their categories.
+
+        Inside a request the change is not committed yet, and a concurrent
+        request could cache the old mapping again in the meantime, so the
+        lookups are dropped again once the unit of work commits.
+        """
+        _lookups.discard_user(self.db_path, user_id)
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.after_commit(lambda: _lookups.discard_user(self.db_path, user_id))
+
+    def _row_to_category(self, row) -> Category:
+        """Convert database row to Category object."""
+        return Category(
+            id=row['id'],
+            user_id=row['user_id'],
+            name=row['name'],
+            color=row['color'],
+            created_at=parse_timestamp(row['created_at'])
+        )
@@ -0,0 +1,182 @@
+"""
+SQL statement instrumentation.
+
+Pooled connections are ``InstrumentedConnection`` objects whose cursors time
+every statement, including the fetches that step through its results. Each
+statement is recorded, under its normalized SQL, into every ``QueryLog``
+active in the current context (one per request, see ``app.views.debug``,
+plus any opened with ``capture_queries``), and statements that take longer
+than ``config.database.slow_query_ms`` go to the slow-query log.
+"""
+import logging
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+
+from config.settings import config
+from app.models import slotted
+
+slow_query_logger = logging.getLogger('finance_tracker.slow_queries')
+
+
+@slotted
+@dataclass
+class QueryRecord:
+    """One executed statement: normalized SQL, seconds spent and rows affected or fetched."""
+    sql: str
+    duration: float = 0.0
+    rows: int = 0
+    slow: bool = False
+
+
+@dataclass
+class QueryLog:
+    """
+    The statements executed while the log was active.
+
+    With ``keep_statements`` the exact SQL and parameters of each
+    ``execute`` are kept too, in ``statements``, for replaying them.
+    """
+    queries: List[QueryRecord] = field(default_factory=list)
+    keep_statements: bool = False
+    statements: List[Tuple[str, object]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        """Total seconds spent in SQL."""
+        return sum(query.duration for query in self.queries)
+
+    def summary(self) -> List[dict]:
+        """Statements grouped by normalized SQL, most total time first."""
+        groups: OrderedDict = OrderedDict()
+        for query in self.queries:
+            group = groups.setdefault(query.sql, {'sql': query.sql, 'count': 0, 'duration': 0.0, 'rows': 0})
+            group['count'] += 1
+            group['duration'] += query.duration
+            group['rows'] += query.rows
+        return sorted(groups.values(), key=lambda group: group['duration'], reverse=True)
+
+
+_active_logs: ContextVar[Tuple[QueryLog, ...]] = ContextVar('query_logs', default=())
+
+
+def push_query_log(log: QueryLog):
+    """Start recording into ``log``; returns a token for ``pop_query_log``."""
+    return _active_logs.set(_active_logs.get() + (log,))
+
+
+def pop_query_log(token):
+    """Stop recording into the log pushed with ``token``."""
+    _active_logs.reset(token)
+
+
+@contextmanager
+def capture_queries(keep_statements: bool = False) -> Iterator[QueryLog]:
+    """Record every statement executed in this context during the block."""
+    log = QueryLog(keep_statements=keep_statements)
+    token = push_query_log(log)
+    try:
+        yield log
+    finally:
+        pop_query_log(token)
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a statement to its shape: literals become ``?``, ``IN`` lists of
+    any length become ``IN (...)`` and whitespace is collapsed.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', 'IN (...)', sql, flags=re.IGNORECASE)
+    return ' '.join(sql.split())
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that records each statement it runs into the active query logs."""
+    __slots__ = ('_record',)
+
+    def execute(self, sql: str, parameters=()):
+        self._start(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._finish(time.perf_counter() - started)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        self._start(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._finish(time.perf_counter() - started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size: int = None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(time.perf_counter() - started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - started, len(rows))
+        return rows
+
+    def _start(self, sql: str, parameters=None):
+        self._record = record = QueryRecord(normalize_sql(sql))
+        for log in _active_logs.get():
+            log.queries.append(record)
+            if log.keep_statements and parameters is not None:
+                log.statements.append((sql, parameters))
+
+    def _finish(self, elapsed: float):
+        record = self._record
+        # rowcount is -1 for SELECTs; their rows are counted as they are fetched
+        if self.rowcount > 0:
+            record.rows = self.rowcount
+        _add_time(record, elapsed)
+
+    def _fetched(self, elapsed: float, rows: int):
+        record = getattr(self, '_record', None)
+        if record is not None:
+            record.rows += rows
+            _add_time(record, elapsed)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind ``execute``, are instrumented."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _add_time(record: QueryRecord, elapsed: float):
+    record.duration += elapsed
+    if not record.slow and record.duration * 1000 >= config.database.slow_query_ms:
+        record.slow = True
+        slow_query_logger.warning("slow query (%.1f ms): %s", record.duration * 1000, record.sql)
@@ -0,0 +1,523 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once, in its own transaction, and records its version in
+the ``schema_version`` table. Add new migrations to the end of ``MIGRATIONS``
+with the next version number; never edit one that has already shipped.
+"""
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List
+
+from app.models import to_cents
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single schema change."""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register a function as the migration for ``version``."""
+    def register(func: Callable[[sqlite3.Cursor], None]):
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return register
+
+
+def _columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+
+@migration(1, "Create base tables")
+def _create_base_tables(cursor: sqlite3.Cursor):
+    # Users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL UNIQUE,
+            phone TEXT NOT NULL,
+            password TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Categories table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            color TEXT DEFAULT '#007bff',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            UNIQUE(user_id, name)
+        )
+    ''')
+
+    # Transactions table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL,
+            description TEXT,
+            payment_method TEXT NOT NULL,
+            transaction_type TEXT DEFAULT 'expense',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Budgets table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            allocated_amount REAL NOT NULL,
+            period TEXT NOT NULL DEFAULT 'monthly',
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            UNIQUE(user_id, category)
+        )
+    ''')
+
+
+@migration(2, "Add transaction_type and created_at to legacy transactions tables")
+def _add_legacy_transaction_columns(cursor: sqlite3.Cursor):
+    columns = _columns(cursor, 'transactions')
+
+    if 'transaction_type' not in columns:
+        cursor.execute("ALTER TABLE transactions ADD COLUMN transaction_type TEXT DEFAULT 'expense'")
+
+    # SQLite cannot add a column with a non-constant default, so backfill instead
+    if 'created_at' not in columns:
+        cursor.execute("ALTER TABLE transactions ADD COLUMN created_at TEXT")
+        cursor.execute("UPDATE transactions SET created_at = CURRENT_TIMESTAMP")
+
+
+@migration(3, "Add composite indexes for per-user transaction lookups")
+def _add_transaction_indexes(cursor: sqlite3.Cursor):
+    # Superseded by the composite indexes below (the legacy db.py schema)
+    cursor.execute("DROP INDEX IF EXISTS ix_tx_user_date")
+    cursor.execute("DROP INDEX IF EXISTS ix_tx_user_cat")
+
+    # Listing, date ranges and chart series
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_date "
+        "ON transactions (user_id, date)"
+    )
+    # Totals by type and category
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_type_category "
+        "ON transactions (user_id, transaction_type, category)"
+    )
+    # Per-category history and budget windows
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_category_date "
+        "ON transactions (user_id, category, date)"
+    )
+
+
+# Keyed by (bucket, category, payment method, transaction_type) per user
+_ROLLUP_TABLES = {
+    'transaction_daily_rollups': ('day', '{row}date'),
+    'transaction_monthly_rollups': ('month', 'substr({row}date, 1, 7)'),
+}
+
+
+@migration(4, "Add daily and monthly transaction rollups maintained by triggers")
+def _add_transaction_rollups(cursor: sqlite3.Cursor):
+    _create_rollups(cursor, amount='amount', total='total', total_type='REAL')
+
+
+def _create_rollups(cursor: sqlite3.Cursor, amount: str, total: str, total_type: str,
+                    category: str = 'category', method: str = 'payment_method', key_type: str = 'TEXT'):
+    """
+    Create and backfill the rollup tables, summing ``amount`` into ``total``.
+
+    ``category`` and ``method`` name the transactions columns the rollups are
+    keyed on; the rollup columns take the same names.
+    """
+    add_rows, remove_rows, backfill = [], [], []
+    for table, (bucket, bucket_expr) in _ROLLUP_TABLES.items():
+        new_bucket = bucket_expr.format(row='NEW.')
+        old_bucket = bucket_expr.format(row='OLD.')
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                user_id INTEGER NOT NULL,
+                {bucket} TEXT NOT NULL,
+                {category} {key_type} NOT NULL,
+                {method} {key_type} NOT NULL,
+                transaction_type TEXT NOT NULL,
+                {total} {total_type} NOT NULL DEFAULT 0,
+                txn_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, {bucket}, {category}, {method}, transaction_type)
+            ) WITHOUT ROWID
+        ''')
+        add_rows.append(f'''
+            INSERT INTO {table}
+                (user_id, {bucket}, {category}, {method}, transaction_type, {total}, txn_count)
+            VALUES (NEW.user_id, {new_bucket}, NEW.{category}, NEW.{method},
+                    COALESCE(NEW.transaction_type, 'expense'), NEW.{amount}, 1)
+            ON CONFLICT (user_id, {bucket}, {category}, {method}, transaction_type)
+            DO UPDATE SET {total} = {total} + excluded.{total}, txn_count = txn_count + 1;
+        ''')
+        key = (f"user_id = OLD.user_id AND {bucket} = {old_bucket} AND {category} = OLD.{category} "
+               f"AND {method} = OLD.{method} "
+               f"AND transaction_type = COALESCE(OLD.transaction_type, 'expense')")
+        remove_rows.append(f'''
+            UPDATE {table} SET {total} = {total} - OLD.{amount}, txn_count = txn_count - 1 WHERE {key};
+            DELETE FROM {table} WHERE {key} AND txn_count <= 0;
+        ''')
+        backfill.append(f'''
+            INSERT INTO {table}
+                (user_id, {bucket}, {category}, {method}, transaction_type, {total}, txn_count)
+            SELECT user_id, {bucket_expr.format(row='')}, {category}, {method},
+                   COALESCE(transaction_type, 'expense'), SUM({amount}), COUNT(*)
+            FROM transactions
+            GROUP BY 1, 2, 3, 4, 5
+        ''')
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+        AFTER INSERT ON transactions
+        BEGIN {''.join(add_rows)} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_delete
+        AFTER DELETE ON transactions
+        BEGIN {''.join(remove_rows)} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+        AFTER UPDATE OF user_id, {amount}, {category}, date, {method}, transaction_type
+        ON transactions
+        BEGIN {''.join(remove_rows)} {''.join(add_rows)} END
+    """)
+
+    for statement in backfill:
+        cursor.execute(statement)
+
+
+def _drop_rollups(cursor: sqlite3.Cursor):
+    """Drop the rollup tables and the triggers maintaining them."""
+    for event in ('insert', 'delete', 'update'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_transactions_rollup_{event}")
+    for table in _ROLLUP_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+@migration(5, "Add per-user data versions bumped on every transaction or budget write")
+def _add_user_data_versions(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_data_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    def bump(row: str) -> str:
+        return f'''
+            INSERT INTO user_data_versions (user_id, version) VALUES ({row}.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+        '''
+
+    for table in ('transactions', 'budgets'):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_insert
+            AFTER INSERT ON {table}
+            BEGIN {bump('NEW')} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_delete
+            AFTER DELETE ON {table}
+            BEGIN {bump('OLD')} END
+        """)
+        # Bumping OLD and NEW separately also covers rows moved between users
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_update
+            AFTER UPDATE ON {table}
+            BEGIN {bump('OLD')} {bump('NEW')} END
+        """)
+
+
+@migration(6, "Add content hashes for de-duplicating imported transactions")
+def _add_transaction_content_hash(cursor: sqlite3.Cursor):
+    if 'content_hash' not in _columns(cursor, 'transactions'):
+        cursor.execute("ALTER TABLE transactions ADD COLUMN content_hash TEXT")
+
+    # Only imported rows carry a hash; hand-entered ones stay NULL and unconstrained
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_transactions_user_content_hash "
+        "ON transactions (user_id, content_hash) WHERE content_hash IS NOT NULL"
+    )
+
+
+@migration(7, "Store money as integer cents")
+def _store_money_as_cents(cursor: sqlite3.Cursor):
+    # The rollups are rebuilt over cents; their triggers read transactions.amount,
+    # which would otherwise block dropping it. Needs SQLite 3.35+ for DROP COLUMN.
+    _drop_rollups(cursor)
+
+    # Backfill with the same rounding as new writes
+    cursor.connection.create_function('to_cents', 1, _legacy_cents, deterministic=True)
+    for table, amount, cents in (('transactions', 'amount', 'amount_cents'),
+                                 ('budgets', 'allocated_amount', 'allocated_cents')):
+        if cents not in _columns(cursor, table):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {cents} INTEGER NOT NULL DEFAULT 0")
+        if amount in _columns(cursor, table):
+            cursor.execute(f"UPDATE {table} SET {cents} = to_cents({amount})")
+            cursor.execute(f"ALTER TABLE {table} DROP COLUMN {amount}")
+
+    _create_rollups(cursor, amount='amount_cents', total='total_cents', total_type='INTEGER')
+
+
+def _legacy_cents(amount) -> int:
+    # Unparseable legacy values count as 0, as SQLite's numeric conversion did
+    try:
+        return to_cents(float(amount))
+    except (TypeError, ValueError, ArithmeticError):
+        return 0
+
+
+@migration(8, "Reference categories and payment methods by integer ID")
+def _dictionary_encode_categories(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS payment_methods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO categories (user_id, name)
+        SELECT DISTINCT user_id, category FROM transactions
+        UNION SELECT DISTINCT user_id, category FROM budgets
+    ''')
+    cursor.execute(
+        "INSERT OR IGNORE INTO payment_methods (name) SELECT DISTINCT payment_method FROM transactions"
+    )
+
+    # Everything keyed on the text columns goes first, or DROP COLUMN refuses
+    _drop_rollups(cursor)
+    cursor.execute("DROP INDEX IF EXISTS ix_transactions_user_type_category")
+    cursor.execute("DROP INDEX IF EXISTS ix_transactions_user_category_date")
+
+    cursor.execute("ALTER TABLE transactions ADD COLUMN category_id INTEGER REFERENCES categories (id)")
+    cursor.execute("ALTER TABLE transactions ADD COLUMN payment_method_id INTEGER REFERENCES payment_methods (id)")
+    cursor.execute('''
+        UPDATE transactions SET
+            category_id = (SELECT c.id FROM categories c
+                           WHERE c.user_id = transactions.user_id AND c.name = transactions.category),
+            payment_method_id = (SELECT p.id FROM payment_methods p
+                                 WHERE p.name = transactions.payment_method)
+    ''')
+    cursor.execute("ALTER TABLE transactions DROP COLUMN category")
+    cursor.execute("ALTER TABLE transactions DROP COLUMN payment_method")
+
+    cursor.execute(
+        "CREATE INDEX ix_transactions_user_type_category "
+        "ON transactions (user_id, transaction_type, category_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX ix_transactions_user_category_date "
+        "ON transactions (user_id, category_id, date)"
+    )
+    _create_rollups(cursor, amount='amount_cents', total='total_cents', total_type='INTEGER',
+                    category='category_id', method='payment_method_id', key_type='INTEGER')
+
+    # budgets.category is part of a UNIQUE constraint, so the table is rebuilt
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'budgets'").fetchone()
+    cursor.execute('''
+        CREATE TABLE budgets_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            allocated_cents INTEGER NOT NULL,
+            period TEXT NOT NULL DEFAULT 'monthly',
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (category_id) REFERENCES categories (id),
+            UNIQUE(user_id, category_id)
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO budgets_new
+            (id, user_id, category_id, allocated_cents, period, start_date, end_date, created_at)
+        SELECT b.id, b.user_id, c.id, b.allocated_cents, b.period, b.start_date, b.end_date, b.created_at
+        FROM budgets b JOIN categories c ON c.user_id = b.user_id AND c.name = b.category
+    ''')
+    cursor.execute("DROP TABLE budgets")
+    cursor.execute("ALTER TABLE budgets_new RENAME TO budgets")
+    if sequence:
+        # Never hand out the IDs of budgets deleted before the rebuild
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'budgets'", sequence)
+    # The budgets version triggers went with the old table
+    _add_user_data_versions(cursor)
+
+    # Renaming a category changes what the user's transactions and budgets show
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_categories_version_update
+        AFTER UPDATE OF name ON categories
+        BEGIN
+            INSERT INTO user_data_versions (user_id, version) VALUES (NEW.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+        END
+    ''')
+
+
+@migration(9, "Add composite indexes for filtered transaction queries")
+def _add_transaction_filter_indexes(cursor: sqlite3.Cursor):
+    # Each filter with an equality column leads its own index, followed by the
+    # default sort key, so filtered listings are range seeks in date order.
+    # Category filters use ix_transactions_user_category_date.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_type_date "
+        "ON transactions (user_id, transaction_type, date)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_method_date "
+        "ON transactions (user_id, payment_method_id, date)"
+    )
+    # Amount ranges and amount sorts
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_amount "
+        "ON transactions (user_id, amount_cents)"
+    )
+
+
+@migration(10, "Add full-text index over transaction descriptions")
+def _add_transaction_search(cursor: sqlite3.Cursor):
+    # External-content FTS5 table: it stores only the index and reads the
+    # description text back from transactions (rowid = transactions.id).
+    # unicode61 folds case and diacritics; the prefix indexes make 2- and
+    # 3-character prefix queries a single lookup.
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            description,
+            content='transactions',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+
+    # Keep the index in step with the table; the 'delete' command needs the
+    # old text to find the tokens to remove.
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+        AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+        AFTER DELETE ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description)
+            VALUES ('delete', OLD.id, OLD.description);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+        AFTER UPDATE OF description ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description)
+            VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO transactions_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END
+    ''')
+
+    # Backfill from the existing rows
+    cursor.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+
+@migration(11, "Index budgets by user in creation order")
+def _add_budget_listing_index(cursor: sqlite3.Cursor):
+    # Budget listings are per user, newest first; without this every listing
+    # sorts the user's budgets in a temporary B-tree
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_budgets_user_created "
+        "ON budgets (user_id, created_at)"
+    )
+
+
+class MigrationRunner:
+    """Applies pending migrations to a database connection."""
+
+    def __init__(self, conn: sqlite3.Connection, migrations: List[Migration] = None):
+        self.conn = conn
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        """Get the schema version recorded in the database (0 if none)."""
+        try:
+            row = self.conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return row[0] or 0
+
+    def run(self) -> List[int]:
+        """
+        Apply every pending migration.
+
+        Returns:
+            list: versions that were applied (empty when already up to date)
+        """
+        # Fast path: an up-to-date database costs a single read, no DDL
+        if self.current_version() >= self.latest_version:
+            return []
+
+        applied = []
+        for item in self.migrations:
+            # BEGIN IMMEDIATE serialises concurrent startups; re-check under the lock
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ensure_version_table()
+                if item.version <= self.current_version():
+                    self.conn.rollback()
+                    continue
+
+                print(f"Applying migration {item.version}: {item.description}...")
+                cursor = self.conn.cursor()
+                item.apply(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (item.version, item.description)
+                )
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            applied.append(item.version)
+
+        return applied
+
+    def _ensure_version_table(self):
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
@@ -0,0 +1,219 @@
+"""
+SQLite connection pooling.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from config.settings import config
+from app.repositories.instrumentation import InstrumentedConnection
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections for a single database file.
+
+    Connections are tuned with PRAGMAs once, when they are opened, and then
+    reused. A thread that releases a connection gets the same one back on its
+    next checkout while it is still idle, which keeps that connection's page
+    cache warm for the thread. Checkouts are re-entrant: nested
+    ``connection()`` blocks on one thread share a single connection.
+    """
+
+    def __init__(self, db_path: str, size: int = None, timeout: float = None,
+                 health_check_interval: float = None):
+        settings = config.database
+        self.db_path = db_path
+        self.size = size or settings.pool_size
+        self.timeout = settings.pool_timeout if timeout is None else timeout
+        self.health_check_interval = (settings.pool_health_check_interval
+                                      if health_check_interval is None
+                                      else health_check_interval)
+
+        self._condition = threading.Condition(threading.Lock())
+        self._idle: List[sqlite3.Connection] = []
+        self._last_used: Dict[int, float] = {}
+        self._opened = 0
+        self._local = threading.local()
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, waiting up to ``timeout`` seconds."""
+        local = self._local
+        if getattr(local, 'depth', 0) > 0:
+            local.depth += 1
+            return local.conn
+
+        conn = self._checkout(getattr(local, 'conn', None))
+        local.conn = conn
+        local.depth = 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection previously obtained from ``acquire``."""
+        local = self._local
+        local.depth -= 1
+        if local.depth > 0:
+            return
+
+        # Never hand a half-finished transaction to the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+
+        with self._condition:
+            if self._closed:
+                self._discard(conn)
+                return
+            self._last_used[id(conn)] = time.monotonic()
+            self._idle.append(conn)
+            self._condition.notify()
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy."""
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                'size': self.size,
+                'opened': self._opened,
+                'idle': idle,
+                'in_use': self._opened - idle,
+            }
+
+    def _checkout(self, preferred: Optional[sqlite3.Connection]) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError(f"Connection pool for {self.db_path} is closed")
+
+                if self._idle:
+                    # Thread affinity: prefer the connection this thread used last
+                    if preferred is not None and preferred in self._idle:
+                        self._idle.remove(preferred)
+                        conn = preferred
+                    else:
+                        conn = self._idle.pop()
+                    break
+
+                if self._opened < self.size:
+                    self._opened += 1
+                    conn = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a connection to {self.db_path}"
+                    )
+                self._condition.wait(remaining)
+
+        if conn is None:
+            return self._open_reserved()
+
+        if self._is_stale(conn) and not self._is_healthy(conn):
+            with self._condition:
+                self._discard(conn)
+                self._opened += 1
+            return self._open_reserved()
+
+        return conn
+
+    def _open_reserved(self) -> sqlite3.Connection:
+        """Open a connection for a slot already counted in ``_opened``."""
+        try:
+            return self._open()
+        except Exception:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+
+    def _open(self) -> sqlite3.Connection:
+        settings = config.database
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=settings.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            factory=InstrumentedConnection if settings.instrument_queries else sqlite3.Connection,
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = {int(settings.cache_size_kib) * -1}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings.mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout = {int(settings.busy_timeout_ms)}")
+        return conn
+
+    def _is_stale(self, conn: sqlite3.Connection) -> bool:
+        last_used = self._last_used.get(id(conn), 0.0)
+        return time.monotonic() - last_used >= self.health_check_interval
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection and free its slot. Caller holds the lock."""
+        self._last_used.pop(id(conn), None)
+        self._opened -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._condition.notify()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Get the shared pool for a database file, creating it on first use."""
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = _pools[db_path] = ConnectionPool(db_path)
+    return pool
+
+
+def pool_stats() -> Dict[str, dict]:
+    """Occupancy of every pool, by database file."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {db_path: pool.stats() for db_path, pool in pools}
+
+
+def close_all_pools():
+    """Close every pool; used on shutdown and between test runs."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,81 @@
+"""
+Query-plan checks for repository SQL.
+
+Statements recorded with ``capture_queries(keep_statements=True)`` are run
+through ``EXPLAIN QUERY PLAN`` and flagged when a hot table is read with a
+full scan or an ORDER BY needs a temporary B-tree, i.e. when a query no
+longer matches the indexes it was written for.
+"""
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, List, Pattern, Sequence, Tuple
+
+from app.repositories.instrumentation import normalize_sql
+
+# Tables that grow with usage; a full scan of any of them is a regression
+HOT_TABLES = ('transactions', 'budgets', 'users')
+
+_PLANNED = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+_TABLE_REFERENCE = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(' + '|'.join(HOT_TABLES) + r')\b(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|SET|LEFT|INNER|GROUP|ORDER|LIMIT|USING)\b)(\w+))?',
+    re.IGNORECASE
+)
+
+
+@dataclass
+class PlanProblem:
+    """A statement whose query plan has a full scan or a sort it should not need."""
+    sql: str
+    detail: str
+    plan: List[str]
+
+    def __str__(self) -> str:
+        plan = '\n    '.join(self.plan)
+        return f"{self.detail} in: {self.sql}\n    {plan}"
+
+
+def explain(conn: sqlite3.Connection, sql: str, parameters=()) -> List[str]:
+    """The ``EXPLAIN QUERY PLAN`` detail lines of a statement."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()]
+
+
+def plan_problems(sql: str, plan: Iterable[str]) -> List[str]:
+    """The plan lines of ``sql`` that scan a hot table or sort for ORDER BY."""
+    names = set()
+    for table, alias in _TABLE_REFERENCE.findall(sql):
+        names.add(table.lower())
+        if alias:
+            names.add(alias.lower())
+
+    problems = []
+    for detail in plan:
+        scan = re.match(r'SCAN (\w+)', detail)
+        if scan and scan.group(1).lower() in names:
+            problems.append(detail)
+        elif detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append(detail)
+    return problems
+
+
+def check_statements(conn: sqlite3.Connection, statements: Iterable[Tuple[str, Sequence]],
+                     allow: Iterable[Pattern] = ()) -> List[PlanProblem]:
+    """
+    Explain each distinct statement and return the problems found.
+
+    ``allow`` holds patterns matched against the normalized SQL of
+    statements that are known and accepted to scan or sort.
+    """
+    allow = list(allow)
+    seen, problems = set(), []
+    for sql, parameters in statements:
+        if sql in seen or not sql.lstrip().upper().startswith(_PLANNED):
+            continue
+        seen.add(sql)
+        normalized = normalize_sql(sql)
+        if any(pattern.search(normalized) for pattern in allow):
+            continue
+        plan = explain(conn, sql, parameters)
+        for detail in plan_problems(sql, plan):
+            problems.append(PlanProblem(normalized, detail, plan))
+    return problems
@@ -1,37 +1,146 @@
 """
 Transaction repository implementation.
 """
-from typing import Optional, List
-from datetime import datetime
+import calendar
+import re
+from typing import Optional, List, Tuple, Iterator
+from datetime import date as date_type
 
-from app.models import Transaction, TransactionType
+from app.models import (Transaction, TransactionType, TransactionFilter, TransactionSort,
+                        TransactionSearchHit, Granularity, TRANSACTION_COLUMNS, to_cents, from_cents)
+from app.models.frame import TransactionFrame
 from app.repositories.base import Repository
+from app.repositories.category_repository import CategoryRepository
+
+# Transaction.from_row columns; category and payment method names come from
+# the dictionary tables, everything else from transactions (aliased t)
+_NAMES = {'category': 'c.name', 'payment_method': 'p.name'}
+_COLUMNS = ', '.join(_NAMES.get(column, 't.' + column) for column in TRANSACTION_COLUMNS)
+_JOIN_NAMES = (
+    "JOIN categories c ON c.id = t.category_id "
+    "JOIN payment_methods p ON p.id = t.payment_method_id"
+)
+_SELECT = f"SELECT {_COLUMNS} FROM transactions t {_JOIN_NAMES}"
+
+# Full-text matches with a highlighted description snippet and BM25 score
+# (lower is better); matched terms are wrapped in SNIPPET_START / SNIPPET_END
+SNIPPET_START, SNIPPET_END = '\x02', '\x03'
+_SEARCH = (
+    f"SELECT {_COLUMNS}, "
+    f"snippet(transactions_fts, 0, '{SNIPPET_START}', '{SNIPPET_END}', '…', 12), "
+    "bm25(transactions_fts) "
+    "FROM transactions_fts "
+    f"JOIN transactions t ON t.id = transactions_fts.rowid {_JOIN_NAMES}"
+)
+
+# Sort key column and direction; ties are broken by id in the same direction
+_SORTS = {
+    TransactionSort.DATE_DESC: ('t.date', 'DESC'),
+    TransactionSort.DATE_ASC: ('t.date', 'ASC'),
+    TransactionSort.AMOUNT_DESC: ('t.amount_cents', 'DESC'),
+    TransactionSort.AMOUNT_ASC: ('t.amount_cents', 'ASC'),
+}
+
+# Series bucket per granularity, as SQL over an ISO date expression {day}
+_BUCKETS = {
+    Granularity.DAY: "{day}",
+    Granularity.WEEK: "date({day}, '-6 days', 'weekday 1')",
+    Granularity.MONTH: "substr({day}, 1, 7)",
+    Granularity.QUARTER: "substr({day}, 1, 5) || 'Q' || ((CAST(substr({day}, 6, 2) AS INTEGER) + 2) / 3)",
+    Granularity.YEAR: "substr({day}, 1, 4)",
+}
+
+# (table, bucket column, bucket expression over transactions.date)
+_ROLLUPS = (
+    ('transaction_daily_rollups', 'day', 'date'),
+    ('transaction_monthly_rollups', 'month', 'substr(date, 1, 7)'),
+)
 
 
 class TransactionRepository(Repository[Transaction]):
-    """Repository for transaction operations."""
+    """
+    Repository for transaction operations.
+    
+    Categories and payment methods are stored as integer IDs and translated
+    to and from names here, so callers only ever see names.
+    """
+    
+    def __init__(self, db_path: str = None):
+        super().__init__(db_path)
+        self.categories = CategoryRepository(self.db_path)
     
     def create(self, transaction: Transaction) -> Transaction:
         """Create a new transaction."""
+        params = self._write_params([transaction])[0]
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """INSERT INTO transactions 
-                   (user_id, amount, category, date, description, payment_method, transaction_type) 
+                   (user_id, amount_cents, category_id, date, description, payment_method_id, transaction_type) 
                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (transaction.user_id, transaction.amount, transaction.category,
-                 transaction.date, transaction.description, transaction.payment_method,
-                 transaction.transaction_type.value)
+                params
             )
-            conn.commit()
             transaction.id = cursor.lastrowid
             return transaction
     
+    def create_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """
+        Insert a batch of transactions with one executemany in one transaction.
+        
+        The batch is all or nothing: a row that fails to insert undoes the
+        rows before it, through a savepoint, so the request can still commit.
+        
+        IDs are assigned from the last inserted rowid: the batch holds the
+        write lock throughout, so AUTOINCREMENT hands out consecutive IDs.
+        """
+        if not transactions:
+            return []
+        
+        params = self._write_params(transactions)
+        with self.get_connection() as conn, self._savepoint(conn):
+            cursor = conn.cursor()
+            cursor.executemany(
+                """INSERT INTO transactions 
+                   (user_id, amount_cents, category_id, date, description, payment_method_id, transaction_type) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                params
+            )
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(transactions) + 1
+            for offset, transaction in enumerate(transactions):
+                transaction.id = first_id + offset
+            return transactions
+    
+    def import_many(self, transactions: List[Transaction]) -> int:
+        """
+        Insert a batch of imported transactions, skipping ones already stored.
+        
+        Duplicates are detected by the unique (user_id, content_hash) index,
+        not by per-row lookups.
+        
+        Returns:
+            int: number of rows actually inserted
+        """
+        if not transactions:
+            return 0
+        
+        params = self._write_params(transactions)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """INSERT INTO transactions 
+                   (user_id, amount_cents, category_id, date, description, payment_method_id, transaction_type, content_hash) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (user_id, content_hash) WHERE content_hash IS NOT NULL DO NOTHING""",
+                [row + (t.content_hash,) for row, t in zip(params, transactions)]
+            )
+            return cursor.rowcount
+    
     def get_by_id(self, transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM transactions WHERE id = ?", (transaction_id,))
+            cursor = self._tuple_cursor(conn)
+            cursor.execute(f"{_SELECT} WHERE t.id = ?", (transaction_id,))
             row = cursor.fetchone()
             
             if row:
@@ -41,28 +150,152 @@ class TransactionRepository(Repository[Transaction]):
     def get_all(self) -> List[Transaction]:
         """Get all transactions."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM transactions ORDER BY date DESC")
+            cursor = self._tuple_cursor(conn)
+            cursor.execute(f"{_SELECT} ORDER BY t.date DESC")
             rows = cursor.fetchall()
             return [self._row_to_transaction(row) for row in rows]
     
     def get_by_user_id(self, user_id: int) -> List[Transaction]:
         """Get all transactions for a specific user."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             cursor.execute(
-                "SELECT * FROM transactions WHERE user_id = ? ORDER BY date DESC",
+                f"{_SELECT} WHERE t.user_id = ? ORDER BY t.date DESC",
                 (user_id,)
             )
             rows = cursor.fetchall()
             return [self._row_to_transaction(row) for row in rows]
     
+    def get_page(self, user_id: int, limit: int, after: Optional[Tuple[str, int]] = None) -> List[Transaction]:
+        """
+        Get up to ``limit`` transactions for a user, newest first.
+        
+        Pages are keyed on (date, id) rather than an offset: ``after`` is the
+        (date, id) of the last row of the previous page, so every page is a
+        single index range seek no matter how deep it is.
+        """
+        return self.query(user_id, TransactionFilter(), limit, after)
+    
+    def query(self, user_id: int, filters: TransactionFilter, limit: int = None,
+              after: Optional[Tuple[object, int]] = None) -> List[Transaction]:
+        """
+        Get a user's transactions matching ``filters``, in the filter's sort order.
+        
+        Every criterion becomes part of one parameterized statement. ``after``
+        is the (sort key, id) of the last row of the previous page, where the
+        sort key is the date or the amount in cents.
+        """
+        statement = self._query_sql(user_id, filters, after)
+        if statement is None:
+            return []
+        sql, params = statement
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.get_connection() as conn:
+            cursor = self._tuple_cursor(conn)
+            cursor.execute(sql, params)
+            return [self._row_to_transaction(row) for row in cursor.fetchall()]
+    
+    def iter_query(self, user_id: int, filters: TransactionFilter,
+                   batch_size: int = None) -> Iterator[Transaction]:
+        """Lazily yield a user's transactions matching ``filters``, in the filter's sort order."""
+        statement = self._query_sql(user_id, filters)
+        if statement is None:
+            return iter(())
+        rows = self._iter_rows(*statement, batch_size, tuples=True)
+        return (self._row_to_transaction(row) for row in rows)
+    
+    def _query_sql(self, user_id: int, filters: TransactionFilter,
+                   after: Optional[Tuple[object, int]] = None) -> Optional[Tuple[str, list]]:
+        """
+        Build the statement for ``query``, or None when nothing can match.
+        
+        Equality filters lead with user_id so each combination can seek one
+        of the composite indexes from migrations 3 and 9.
+        """
+        where = self._filter_clauses(user_id, filters)
+        if where is None:
+            return None
+        clauses, params = where
+        
+        key, direction = _SORTS[filters.sort]
+        if after:
+            clauses.append(f"({key}, t.id) {'<' if direction == 'DESC' else '>'} (?, ?)")
+            params.extend(after)
+        
+        sql = f"{_SELECT} WHERE {' AND '.join(clauses)} ORDER BY {key} {direction}, t.id {direction}"
+        return sql, params
+    
+    def _filter_clauses(self, user_id: int, filters: TransactionFilter) -> Optional[Tuple[List[str], list]]:
+        """
+        WHERE clauses and parameters for ``filters`` over transactions (aliased t),
+        or None when every requested category or payment method is unknown.
+        """
+        clauses, params = ["t.user_id = ?"], [user_id]
+        if filters.categories:
+            ids = self.categories.get_ids(user_id, filters.categories)
+            if not ids:
+                return None
+            clauses.append(f"t.category_id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids.values())
+        if filters.payment_methods:
+            ids = self.categories.get_payment_method_ids(filters.payment_methods)
+            if not ids:
+                return None
+            clauses.append(f"t.payment_method_id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids.values())
+        if filters.transaction_type is not None:
+            clauses.append("t.transaction_type = ?")
+            params.append(filters.transaction_type.value)
+        if filters.start_date:
+            clauses.append("t.date >= ?")
+            params.append(filters.start_date)
+        if filters.end_date:
+            clauses.append("t.date <= ?")
+            params.append(filters.end_date)
+        if filters.min_amount is not None:
+            clauses.append("t.amount_cents >= ?")
+            params.append(to_cents(filters.min_amount))
+        if filters.max_amount is not None:
+            clauses.append("t.amount_cents <= ?")
+            params.append(to_cents(filters.max_amount))
+        return clauses, params
+    
+    def search(self, user_id: int, text: str, filters: TransactionFilter = None,
+               limit: int = 50) -> List[TransactionSearchHit]:
+        """
+        Full-text search of a user's transaction descriptions, best match first.
+        
+        Every word of ``text`` must match, as a word or the start of one
+        ("ube" finds "Uber"). Results are ranked by BM25 and carry a snippet
+        of the description with matches wrapped in ``SNIPPET_START`` and
+        ``SNIPPET_END``. ``filters`` narrow the results; their sort is ignored.
+        """
+        match = _fts_query(text)
+        where = self._filter_clauses(user_id, filters or TransactionFilter())
+        if not match or where is None:
+            return []
+        clauses, params = where
+        
+        with self.get_connection() as conn:
+            cursor = self._tuple_cursor(conn)
+            cursor.execute(
+                f"""{_SEARCH} WHERE transactions_fts MATCH ? AND {' AND '.join(clauses)}
+                    ORDER BY bm25(transactions_fts) LIMIT ?""",
+                [match] + params + [limit]
+            )
+            return [
+                TransactionSearchHit(transaction=self._row_to_transaction(row[:-2]), snippet=row[-2], rank=row[-1])
+                for row in cursor.fetchall()
+            ]
+    
     def get_by_user_and_type(self, user_id: int, transaction_type: TransactionType) -> List[Transaction]:
         """Get transactions by user and type."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             cursor.execute(
-                "SELECT * FROM transactions WHERE user_id = ? AND transaction_type = ? ORDER BY date DESC",
+                f"{_SELECT} WHERE t.user_id = ? AND t.transaction_type = ? ORDER BY t.date DESC",
                 (user_id, transaction_type.value)
             )
             rows = cursor.fetchall()
@@ -70,11 +303,14 @@ class TransactionRepository(Repository[Transaction]):
     
     def get_by_category(self, user_id: int, category: str) -> List[Transaction]:
         """Get transactions by category."""
+        category_id = self.categories.get_id(user_id, category)
+        if category_id is None:
+            return []
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             cursor.execute(
-                "SELECT * FROM transactions WHERE user_id = ? AND category = ? ORDER BY date DESC",
-                (user_id, category)
+                f"{_SELECT} WHERE t.user_id = ? AND t.category_id = ? ORDER BY t.date DESC",
+                (user_id, category_id)
             )
             rows = cursor.fetchall()
             return [self._row_to_transaction(row) for row in rows]
@@ -82,80 +318,268 @@ class TransactionRepository(Repository[Transaction]):
     def get_by_date_range(self, user_id: int, start_date: str, end_date: str = None) -> List[Transaction]:
         """Get transactions within date range."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             if end_date:
                 cursor.execute(
-                    "SELECT * FROM transactions WHERE user_id = ? AND date >= ? AND date <= ? ORDER BY date DESC",
+                    f"{_SELECT} WHERE t.user_id = ? AND t.date >= ? AND t.date <= ? ORDER BY t.date DESC",
                     (user_id, start_date, end_date)
                 )
             else:
                 cursor.execute(
-                    "SELECT * FROM transactions WHERE user_id = ? AND date >= ? ORDER BY date DESC",
+                    f"{_SELECT} WHERE t.user_id = ? AND t.date >= ? ORDER BY t.date DESC",
                     (user_id, start_date)
                 )
             rows = cursor.fetchall()
             return [self._row_to_transaction(row) for row in rows]
     
+    def iter_by_user_id(self, user_id: int, batch_size: int = None) -> Iterator[Transaction]:
+        """Lazily yield all transactions for a user, newest first."""
+        rows = self._iter_rows(
+            f"{_SELECT} WHERE t.user_id = ? ORDER BY t.date DESC",
+            (user_id,), batch_size, tuples=True
+        )
+        return (self._row_to_transaction(row) for row in rows)
+    
+    def iter_by_user_and_type(self, user_id: int, transaction_type: TransactionType,
+                              batch_size: int = None) -> Iterator[Transaction]:
+        """Lazily yield transactions by user and type, newest first."""
+        rows = self._iter_rows(
+            f"{_SELECT} WHERE t.user_id = ? AND t.transaction_type = ? ORDER BY t.date DESC",
+            (user_id, transaction_type.value), batch_size, tuples=True
+        )
+        return (self._row_to_transaction(row) for row in rows)
+    
+    def iter_by_category(self, user_id: int, category: str, batch_size: int = None) -> Iterator[Transaction]:
+        """Lazily yield transactions by category, newest first."""
+        category_id = self.categories.get_id(user_id, category)
+        if category_id is None:
+            return iter(())
+        rows = self._iter_rows(
+            f"{_SELECT} WHERE t.user_id = ? AND t.category_id = ? ORDER BY t.date DESC",
+            (user_id, category_id), batch_size, tuples=True
+        )
+        return (self._row_to_transaction(row) for row in rows)
+    
+    def iter_by_date_range(self, user_id: int, start_date: str, end_date: str = None,
+                           batch_size: int = None) -> Iterator[Transaction]:
+        """Lazily yield transactions within a date range, newest first."""
+        if end_date:
+            rows = self._iter_rows(
+                f"{_SELECT} WHERE t.user_id = ? AND t.date >= ? AND t.date <= ? ORDER BY t.date DESC",
+                (user_id, start_date, end_date), batch_size, tuples=True
+            )
+        else:
+            rows = self._iter_rows(
+                f"{_SELECT} WHERE t.user_id = ? AND t.date >= ? ORDER BY t.date DESC",
+                (user_id, start_date), batch_size, tuples=True
+            )
+        return (self._row_to_transaction(row) for row in rows)
+    
+    def iter_filtered(self, user_id: int, start_date: str = None, end_date: str = None,
+                      category: str = None, batch_size: int = None) -> Iterator[Transaction]:
+        """Lazily yield a user's transactions with optional date-range and category filters, newest first."""
+        filters = TransactionFilter(start_date=start_date, end_date=end_date,
+                                    categories=[category] if category else [])
+        return self.iter_query(user_id, filters, batch_size)
+    
     def update(self, transaction: Transaction) -> Transaction:
         """Update transaction."""
+        _, amount_cents, category_id, date, description, method_id, transaction_type = (
+            self._write_params([transaction])[0]
+        )
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """UPDATE transactions SET amount = ?, category = ?, date = ?, 
-                   description = ?, payment_method = ?, transaction_type = ? 
+                """UPDATE transactions SET amount_cents = ?, category_id = ?, date = ?, 
+                   description = ?, payment_method_id = ?, transaction_type = ? 
                    WHERE id = ?""",
-                (transaction.amount, transaction.category, transaction.date,
-                 transaction.description, transaction.payment_method,
-                 transaction.transaction_type.value, transaction.id)
+                (amount_cents, category_id, date, description, method_id, transaction_type,
+                 transaction.id)
             )
-            conn.commit()
             return transaction
     
+    def update_for_user(self, transaction: Transaction, user_id: int) -> bool:
+        """Update transaction only if it belongs to the given user."""
+        # IDs are resolved in the caller's namespace; another user's row is never touched
+        _, amount_cents, category_id, date, description, method_id, transaction_type = (
+            self._write_params([transaction], user_id)[0]
+        )
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """UPDATE transactions SET amount_cents = ?, category_id = ?, date = ?, 
+                   description = ?, payment_method_id = ?, transaction_type = ? 
+                   WHERE id = ? AND user_id = ?""",
+                (amount_cents, category_id, date, description, method_id, transaction_type,
+                 transaction.id, user_id)
+            )
+            return cursor.rowcount > 0
+    
     def delete(self, transaction_id: int) -> bool:
         """Delete transaction by ID."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
-    def get_total_by_type(self, user_id: int, transaction_type: TransactionType) -> float:
-        """Get total amount by transaction type."""
+    def delete_for_user(self, transaction_id: int, user_id: int) -> bool:
+        """Delete transaction only if it belongs to the given user."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT SUM(amount) FROM transactions WHERE user_id = ? AND transaction_type = ?",
-                (user_id, transaction_type.value)
+                "DELETE FROM transactions WHERE id = ? AND user_id = ?",
+                (transaction_id, user_id)
             )
-            result = cursor.fetchone()
-            return result[0] if result[0] else 0.0
+            return cursor.rowcount > 0
     
     def get_category_totals(self, user_id: int, transaction_type: TransactionType) -> dict:
         """Get total amounts grouped by category."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT category, SUM(amount) FROM transactions WHERE user_id = ? AND transaction_type = ? GROUP BY category",
+                """SELECT c.name, SUM(r.total_cents) FROM transaction_monthly_rollups r
+                   JOIN categories c ON c.id = r.category_id
+                   WHERE r.user_id = ? AND r.transaction_type = ? GROUP BY r.category_id""",
                 (user_id, transaction_type.value)
             )
             rows = cursor.fetchall()
-            return {row[0]: row[1] for row in rows}
+            return {row[0]: from_cents(row[1]) for row in rows}
+    
+    def get_bucketed_totals(self, user_id: int, transaction_type: TransactionType,
+                            granularity: Granularity, start_date: str = None,
+                            end_date: str = None) -> List[tuple]:
+        """
+        Get (bucket, total) pairs in bucket order, optionally within a date window.
+        
+        Buckets are YYYY-MM-DD for days, the Monday starting each week, YYYY-MM
+        for months, YYYY-Qn for quarters and YYYY for years. Grouping and the
+        window are applied in SQL over the rollups, as a range seek on their
+        primary key, so the cost follows the window rather than the history.
+        Month and coarser buckets read the monthly rollup when the window is
+        whole months. Rows with unparseable legacy dates are left out.
+        """
+        monthly = (granularity in (Granularity.MONTH, Granularity.QUARTER, Granularity.YEAR)
+                   and (not start_date or start_date.endswith('-01'))
+                   and (not end_date or _is_month_end(end_date)))
+        if monthly:
+            table, column, day = 'transaction_monthly_rollups', 'month', "month || '-01'"
+            bounds = [value[:7] if value else None for value in (start_date, end_date)]
+        else:
+            table, column, day = 'transaction_daily_rollups', 'day', 'day'
+            bounds = [start_date, end_date]
+        
+        clauses = ["user_id = ?", "transaction_type = ?", f"date({day}) IS NOT NULL"]
+        params = [user_id, transaction_type.value]
+        for operator, bound in zip(('>=', '<='), bounds):
+            if bound:
+                clauses.append(f"{column} {operator} ?")
+                params.append(bound)
+        
+        with self.get_connection() as conn:
+            cursor = self._tuple_cursor(conn)
+            cursor.execute(
+                f"""SELECT {_BUCKETS[granularity].format(day=day)} AS bucket, SUM(total_cents)
+                    FROM {table} WHERE {' AND '.join(clauses)}
+                    GROUP BY bucket ORDER BY bucket""",
+                params
+            )
+            return [(row[0], from_cents(row[1])) for row in cursor.fetchall()]
+    
+    def load_frame(self, user_id: int) -> TransactionFrame:
+        """
+        Load a user's transactions as a columnar frame for analytics.
+        
+        Read from the daily rollup, so the frame holds one entry per day,
+        category, payment method and type rather than one per transaction;
+        every analytic over whole days gives the same answer either way.
+        Category and payment-method IDs go straight into the frame's codes.
+        """
+        with self.get_connection() as conn:
+            cursor = self._tuple_cursor(conn)
+            cursor.execute(
+                """SELECT day, category_id, payment_method_id, transaction_type, total_cents, txn_count
+                   FROM transaction_daily_rollups WHERE user_id = ?""",
+                (user_id,)
+            )
+            rows = cursor.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 6
+        days, category_ids, method_ids, types, cents, counts = columns
+        return TransactionFrame.from_encoded(
+            days, category_ids, self.categories.get_names(user_id),
+            method_ids, self.categories.get_payment_method_names(), types, cents, counts
+        )
+    
+    def rebuild_rollups(self, user_id: int = None):
+        """
+        Recompute the daily and monthly rollups from the transactions table.
+        
+        Triggers keep the rollups current on every write; this is for repairing
+        them, for one user or for everyone.
+        """
+        user_filter = "WHERE user_id = ?" if user_id is not None else ""
+        params = (user_id,) if user_id is not None else ()
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for table, bucket, bucket_expr in _ROLLUPS:
+                cursor.execute(f"DELETE FROM {table} {user_filter}", params)
+                cursor.execute(
+                    f"""INSERT INTO {table}
+                        (user_id, {bucket}, category_id, payment_method_id, transaction_type, total_cents, txn_count)
+                        SELECT user_id, {bucket_expr}, category_id, payment_method_id,
+                               COALESCE(transaction_type, 'expense'), SUM(amount_cents), COUNT(*)
+                        FROM transactions {user_filter}
+                        GROUP BY 1, 2, 3, 4, 5""",
+                    params
+                )
+    
+    def _write_params(self, transactions: List[Transaction], user_id: int = None) -> List[tuple]:
+        """
+        Column values for inserting or updating transactions, with category and
+        payment-method names resolved (and created if new) to IDs.
+        
+        Categories are resolved for ``user_id`` when given, else for each
+        transaction's own user.
+        """
+        owners = [user_id or t.user_id for t in transactions]
+        category_ids = {
+            owner: self.categories.resolve_ids(
+                owner, (t.category for t, o in zip(transactions, owners) if o == owner)
+            )
+            for owner in set(owners)
+        }
+        method_ids = self.categories.resolve_payment_method_ids(t.payment_method for t in transactions)
+        return [
+            (t.user_id, to_cents(t.amount), category_ids[owner][t.category], t.date,
+             t.description, method_ids[t.payment_method], t.transaction_type.value)
+            for t, owner in zip(transactions, owners)
+        ]
+    
+    def _tuple_cursor(self, conn):
+        """Cursor returning plain tuples, for positional mapping via Transaction.from_row."""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
     
     def _row_to_transaction(self, row) -> Transaction:
         """Convert database row to Transaction object."""
-        # Handle cases where transaction_type might be None for old records
-        try:
-            transaction_type = row['transaction_type'] if row['transaction_type'] else 'expense'
-        except (KeyError, IndexError):
-            transaction_type = 'expense'
-        
-        return Transaction(
-            id=row['id'],
-            user_id=row['user_id'],
-            amount=row['amount'],
-            category=row['category'],
-            date=row['date'],
-            description=row['description'],
-            payment_method=row['payment_method'],
-            transaction_type=TransactionType(transaction_type)
-        )
\ No newline at end of file
+        return Transaction.from_row(row)
+
+
+def _is_month_end(value: str) -> bool:
+    """Check whether an ISO date is the last day of its month."""
+    try:
+        day = date_type.fromisoformat(value)
+    except ValueError:
+        return False
+    return day.day == calendar.monthrange(day.year, day.month)[1]
+
+
+def _fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+    
+    Words are quoted so FTS5 operators and punctuation in user input are
+    taken literally; returns '' when there is nothing to search for.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text or ''))
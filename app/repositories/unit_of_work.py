@@ -0,0 +1,97 @@
+"""
+Request-scoped unit of work.
+"""
+import sqlite3
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask, g, has_request_context
+
+from app.repositories.pool import get_pool
+
+
+class UnitOfWork:
+    """
+    Shares one connection and one transaction per database between every
+    repository used while the unit of work is active.
+
+    Repositories never commit on their own while a unit of work is bound;
+    the owner calls ``commit`` once at the end and ``close`` to hand the
+    connections back to their pools.
+    """
+
+    def __init__(self):
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._after_commit: List[Callable[[], None]] = []
+
+    def connection(self, db_path: str) -> sqlite3.Connection:
+        """Get the connection for a database, checking it out on first use."""
+        conn = self._connections.get(db_path)
+        if conn is None:
+            conn = self._connections[db_path] = get_pool(db_path).acquire()
+        return conn
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether any connection holds uncommitted writes."""
+        return any(conn.in_transaction for conn in self._connections.values())
+
+    def after_commit(self, callback: Callable[[], None]):
+        """Run ``callback`` once the pending writes are committed; dropped if they are not."""
+        self._after_commit.append(callback)
+
+    def commit(self):
+        """Commit every open transaction, then run the ``after_commit`` callbacks."""
+        for conn in self._connections.values():
+            if conn.in_transaction:
+                conn.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        """Roll back every open transaction."""
+        for conn in self._connections.values():
+            if conn.in_transaction:
+                conn.rollback()
+
+    def close(self):
+        """Roll back anything left uncommitted and release all connections."""
+        connections, self._connections = self._connections, {}
+        self._after_commit = []
+        for db_path, conn in connections.items():
+            get_pool(db_path).release(conn)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """Get the unit of work bound to the current request, if any."""
+    if not has_request_context():
+        return None
+    uow = g.get('unit_of_work')
+    if uow is None:
+        uow = g.unit_of_work = UnitOfWork()
+    return uow
+
+
+def init_app(app: Flask):
+    """
+    Commit each request's unit of work once, before the response goes out.
+
+    Flask still runs ``after_request`` for a view that raised and became a
+    500, so server errors are not committed: their writes are rolled back
+    when the connections go back to the pool.
+    """
+
+    @app.after_request
+    def _commit_unit_of_work(response):
+        uow = g.get('unit_of_work')
+        if uow is not None and response.status_code < 500:
+            uow.commit()
+        return response
+
+    @app.teardown_request
+    def _close_unit_of_work(exc):
+        uow = g.pop('unit_of_work', None)
+        if uow is not None:
+            if exc is not None:
+                uow.rollback()
+            uow.close()
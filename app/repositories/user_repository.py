@@ -20,7 +20,6 @@ class UserRepository(Repository[User]):
                    VALUES (?, ?, ?, ?)""",
                 (user.username, user.email, user.phone, user.password_hash)
             )
-            conn.commit()
             user.id = cursor.lastrowid
             return user
     
@@ -85,7 +84,6 @@ class UserRepository(Repository[User]):
                    WHERE id = ?""",
                 (user.username, user.email, user.phone, user.id)
             )
-            conn.commit()
             return user
     
     def delete(self, user_id: int) -> bool:
@@ -93,9 +91,21 @@ class UserRepository(Repository[User]):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
+    def get_data_version(self, user_id: int) -> int:
+        """
+        Get the user's data version.
+        
+        Triggers bump it on every write to the user's transactions or budgets,
+        so anything derived from that data can be keyed on it.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM user_data_versions WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+    
     def authenticate(self, username: str, password: str) -> Optional[User]:
         """Authenticate user by username and password."""
         user = self.get_by_username(username)
@@ -7,14 +7,19 @@ from datetime import datetime
 from app.models import Budget, BudgetAnalytics, BudgetPeriod, TransactionType
 from app.repositories.budget_repository import BudgetRepository
 from app.repositories.transaction_repository import TransactionRepository
+from app.services.cache import AnalyticsCache, analytics_cache
+from app.services.transaction_service import TransactionService
 
 
 class BudgetService:
     """Service for budget-related operations."""
     
-    def __init__(self, budget_repository: BudgetRepository = None, transaction_repository: TransactionRepository = None):
+    def __init__(self, budget_repository: BudgetRepository = None, transaction_repository: TransactionRepository = None,
+                 cache: AnalyticsCache = None, transaction_service: TransactionService = None):
         self.budget_repository = budget_repository or BudgetRepository()
         self.transaction_repository = transaction_repository or TransactionRepository()
+        self.cache = cache or analytics_cache
+        self.transaction_service = transaction_service or TransactionService(self.transaction_repository, self.cache)
     
     def create_budget(self, user_id: int, category: str, allocated_amount: float,
                      period: str, start_date: str, end_date: str = None) -> tuple[bool, str, Optional[Budget]]:
@@ -34,11 +39,11 @@ class BudgetService:
             if existing_budget:
                 return False, "Budget already exists for this category. Use update instead.", None
             
-            # Validate date format
+            # Validate dates and store them zero-padded, as analytics compare them as ISO dates
             try:
-                datetime.strptime(start_date, '%Y-%m-%d')
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date().isoformat()
                 if end_date:
-                    datetime.strptime(end_date, '%Y-%m-%d')
+                    end_date = datetime.strptime(end_date, '%Y-%m-%d').date().isoformat()
             except ValueError:
                 return False, "Dates must be in YYYY-MM-DD format", None
             
@@ -65,17 +70,20 @@ class BudgetService:
     
     def get_budget_analytics(self, user_id: int) -> List[BudgetAnalytics]:
         """Get budget analytics with spending tracking."""
+        return self.cache.get_or_compute(
+            user_id, 'budget_analytics', lambda: self._compute_budget_analytics(user_id),
+            db_path=self.budget_repository.db_path
+        )
+    
+    def _compute_budget_analytics(self, user_id: int) -> List[BudgetAnalytics]:
+        """Compute budget analytics, masking each budget's window over the transaction frame."""
         budgets = self.budget_repository.get_by_user_id(user_id)
-        analytics = []
-        
-        for budget in budgets:
-            spent_amount = self._calculate_spent_amount(user_id, budget)
-            analytics.append(BudgetAnalytics(
-                budget=budget,
-                spent_amount=spent_amount
-            ))
-        
-        return analytics
+        frame = self.transaction_service.get_transaction_frame(user_id)
+        spent = frame.window_totals((b.category, b.start_date, b.end_date) for b in budgets)
+        return [
+            BudgetAnalytics(budget=budget, spent_amount=spent_amount)
+            for budget, spent_amount in zip(budgets, spent)
+        ]
     
     def get_budget_warnings(self, user_id: int) -> List[Dict]:
         """Get budget warnings for overspent or near-limit categories."""
@@ -112,19 +120,15 @@ class BudgetService:
             tuple: (success, message)
         """
         try:
-            # Verify ownership
-            budget = self.budget_repository.get_by_id(budget_id)
-            if not budget or budget.user_id != user_id:
-                return False, "Budget not found or unauthorized"
-            
             if allocated_amount <= 0:
                 return False, "Valid allocated amount is required"
             
-            success = self.budget_repository.update_allocation(budget_id, allocated_amount)
+            # Ownership is enforced by the UPDATE itself, in a single round trip
+            success = self.budget_repository.update_allocation_for_user(budget_id, user_id, allocated_amount)
             if success:
                 return True, "Budget updated successfully!"
             else:
-                return False, "Failed to update budget"
+                return False, "Budget not found or unauthorized"
                 
         except Exception as e:
             return False, f"Error updating budget: {str(e)}"
@@ -137,16 +141,12 @@ class BudgetService:
             tuple: (success, message)
         """
         try:
-            # Verify ownership
-            budget = self.budget_repository.get_by_id(budget_id)
-            if not budget or budget.user_id != user_id:
-                return False, "Budget not found or unauthorized"
-            
-            success = self.budget_repository.delete(budget_id)
+            # Ownership is enforced by the DELETE itself, in a single round trip
+            success = self.budget_repository.delete_for_user(budget_id, user_id)
             if success:
                 return True, "Budget deleted successfully!"
             else:
-                return False, "Failed to delete budget"
+                return False, "Budget not found or unauthorized"
                 
         except Exception as e:
             return False, f"Error deleting budget: {str(e)}"
@@ -195,19 +195,3 @@ class BudgetService:
                 }
         
         return breakdown
-    
-    def _calculate_spent_amount(self, user_id: int, budget: Budget) -> float:
-        """Calculate amount spent for a specific budget."""
-        # Get transactions within the budget period
-        transactions = self.transaction_repository.get_by_date_range(
-            user_id, budget.start_date, budget.end_date
-        )
-        
-        # Filter by category and expense type
-        spent = 0
-        for transaction in transactions:
-            if (transaction.category == budget.category and 
-                transaction.transaction_type == TransactionType.EXPENSE):
-                spent += transaction.amount
-        
-        return spent
\ No newline at end of file
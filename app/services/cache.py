@@ -0,0 +1,198 @@
+"""
+Per-user analytics caching.
+"""
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Hashable
+
+from config.settings import config
+from app.repositories.unit_of_work import current_unit_of_work
+from app.repositories.user_repository import UserRepository
+
+MISSING = object()
+
+
+class Cache(ABC):
+    """Abstract cache backend."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """Get a cached value, or ``MISSING``."""
+        pass
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any):
+        """Store a value."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Hit/miss counters and occupancy."""
+        pass
+
+
+class NullCache(Cache):
+    """Cache backend that stores nothing; used when caching is disabled."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        self.misses += 1
+        return MISSING
+
+    def set(self, key: Hashable, value: Any):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        return {'hits': 0, 'misses': self.misses, 'evictions': 0, 'entries': 0, 'bytes': 0}
+
+
+class LRUCache(Cache):
+    """
+    Thread-safe in-process LRU cache bounded by entry count, approximate
+    memory use and entry age.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0,
+                 max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, value: Any):
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def approximate_size(value: Any, _seen: set = None) -> int:
+    """Rough deep size of a value in bytes, for enforcing memory bounds."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k, seen) + approximate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item, seen) for item in value)
+    elif is_dataclass(value) and not isinstance(value, type):
+        size += sum(approximate_size(getattr(value, f.name), seen) for f in fields(value))
+    return size
+
+
+class AnalyticsCache:
+    """
+    Caches derived analytics per user, keyed on the user's data version.
+
+    Every write to a user's transactions or budgets bumps that version (see
+    migration 5), so an entry computed for an older version can never be
+    served again; it simply ages out of the LRU.
+    """
+
+    def __init__(self, backend: Cache = None, user_repository: UserRepository = None):
+        self.backend = backend or _default_backend()
+        self.user_repository = user_repository or UserRepository()
+
+    def get_or_compute(self, user_id: int, name: str, compute: Callable[[], Any],
+                       *args: Hashable, db_path: str = None) -> Any:
+        """
+        Return the cached value for ``name(*args)``, computing it on a miss.
+
+        ``db_path`` is the database the value is computed from; user IDs and
+        data versions are only unique within one database.
+        """
+        # Results that include this request's uncommitted writes must not be
+        # cached: if the request rolls back, the version number is reused.
+        uow = current_unit_of_work()
+        if uow is not None and uow.in_transaction:
+            return compute()
+
+        users = self.user_repository
+        if db_path is not None and db_path != users.db_path:
+            users = UserRepository(db_path)
+        key = (users.db_path, user_id, users.get_data_version(user_id), name, args)
+        value = self.backend.get(key)
+        if value is MISSING:
+            value = compute()
+            self.backend.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+def _default_backend() -> Cache:
+    settings = config.cache
+    if not settings.enabled:
+        return NullCache()
+    return LRUCache(
+        max_entries=settings.max_entries,
+        ttl_seconds=settings.ttl_seconds,
+        max_bytes=settings.max_bytes,
+    )
+
+
+# Shared by every service instance in the process
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,84 @@
+"""
+Export service for streaming a user's transactions out as CSV or JSON lines.
+"""
+import csv
+import io
+import json
+from typing import Iterator
+
+from app.models import Transaction
+from app.repositories.transaction_repository import TransactionRepository
+
+EXPORT_FIELDS = ('id', 'date', 'category', 'amount', 'payment_method',
+                 'transaction_type', 'description')
+
+# Rows serialised per yielded chunk; keeps writes to the socket reasonably sized
+ROWS_PER_CHUNK = 500
+
+
+class ExportService:
+    """Service for streaming transaction exports."""
+    
+    FORMATS = ('csv', 'ndjson')
+    
+    def __init__(self, transaction_repository: TransactionRepository = None):
+        self.transaction_repository = transaction_repository or TransactionRepository()
+    
+    def stream(self, user_id: int, export_format: str, start_date: str = None,
+               end_date: str = None, category: str = None) -> Iterator[str]:
+        """
+        Yield an export in text chunks as rows are read from the database.
+        
+        Only one chunk of rows is held in memory at a time, however many
+        transactions the user has.
+        
+        Raises:
+            ValueError: if ``export_format`` is not supported
+        """
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Export format must be one of: {', '.join(self.FORMATS)}")
+        
+        transactions = self.transaction_repository.iter_filtered(
+            user_id, start_date=start_date, end_date=end_date, category=category
+        )
+        if export_format == 'csv':
+            return self._stream_csv(transactions)
+        return self._stream_ndjson(transactions)
+    
+    def _stream_csv(self, transactions: Iterator[Transaction]) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        
+        for count, transaction in enumerate(transactions, start=1):
+            writer.writerow([value for _, value in _export_values(transaction)])
+            if count % ROWS_PER_CHUNK == 0:
+                yield _drain(buffer)
+        yield _drain(buffer)
+    
+    def _stream_ndjson(self, transactions: Iterator[Transaction]) -> Iterator[str]:
+        lines = []
+        for transaction in transactions:
+            lines.append(json.dumps(dict(_export_values(transaction))))
+            if len(lines) == ROWS_PER_CHUNK:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+
+def _export_values(transaction: Transaction):
+    """(field, value) pairs of a transaction in export column order."""
+    for name in EXPORT_FIELDS:
+        value = getattr(transaction, name)
+        if name == 'transaction_type':
+            value = value.value
+        yield name, value
+
+
+def _drain(buffer: io.StringIO) -> str:
+    """Take everything written to a buffer so far and reset it."""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return data
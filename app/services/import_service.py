@@ -0,0 +1,189 @@
+"""
+Import service for loading bank-statement CSV files into transactions.
+"""
+import csv
+import hashlib
+import math
+from collections import Counter
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Dict, List, Optional, TextIO
+
+from config.settings import config
+from app.models import ImportResult, Transaction
+from app.services.transaction_service import TransactionService, is_iso_date
+
+# Keep the error report bounded however broken the file is
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ColumnMapping:
+    """
+    Maps statement CSV headers onto transaction fields.
+
+    Leave a column as None when the statement has no such column; the
+    matching default is used instead. With ``signed_amounts`` the type is
+    taken from the amount's sign (negative = expense) rather than a column.
+    """
+    date: str = 'date'
+    amount: str = 'amount'
+    category: Optional[str] = 'category'
+    description: Optional[str] = 'description'
+    payment_method: Optional[str] = 'payment_method'
+    transaction_type: Optional[str] = 'transaction_type'
+    date_format: str = '%Y-%m-%d'
+    signed_amounts: bool = False
+    default_category: str = 'Uncategorized'
+    default_payment_method: str = 'Bank'
+    default_transaction_type: str = 'expense'
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ColumnMapping':
+        """
+        Build a mapping from a dict, ignoring unknown keys.
+
+        Raises:
+            ValueError: if ``data`` is not a dict or a value has the wrong type
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Column mapping must be an object")
+        values = {}
+        for f in fields(cls):
+            if f.name not in data:
+                continue
+            value = data[f.name]
+            if f.type is bool:
+                valid = isinstance(value, bool)
+            elif f.type is str:
+                valid = isinstance(value, str)
+            else:
+                valid = value is None or isinstance(value, str)
+            if not valid:
+                raise ValueError(f"Column mapping field '{f.name}' has the wrong type")
+            values[f.name] = value
+        return cls(**values)
+
+
+class ImportService:
+    """Service for streaming CSV statement imports."""
+
+    def __init__(self, transaction_service: TransactionService = None):
+        self.transaction_service = transaction_service or TransactionService()
+        self.transaction_repository = self.transaction_service.transaction_repository
+
+    def import_csv(self, user_id: int, stream: TextIO, mapping: ColumnMapping = None,
+                   chunk_size: int = None) -> ImportResult:
+        """
+        Import a CSV statement from a text stream.
+
+        The file is read row by row and inserted in chunks, each committed in
+        its own transaction, so rows are never all held in memory; only a
+        16-byte digest per distinct row is kept for duplicate numbering. Rows
+        go through ``TransactionService.build_transaction``, the same rules as
+        transactions entered by hand.
+
+        A file that is not UTF-8 text or not valid CSV stops the import at the
+        line where reading failed; the chunks before it stay imported and the
+        failure is reported as an error for that line.
+
+        Re-importing a statement, or one that overlaps an earlier import,
+        skips the rows already stored: each row carries a content hash that a
+        unique index enforces per user.
+        """
+        mapping = mapping or ColumnMapping()
+        chunk_size = chunk_size or config.import_chunk_size
+        result = ImportResult()
+
+        # Identical rows within one file (two equal coffees on the same day)
+        # are told apart by their occurrence number.
+        occurrences = Counter()
+        chunk: List[Transaction] = []
+
+        reader = csv.DictReader(stream)
+        try:
+            for row in reader:
+                # Line numbers are 1-based and count the header
+                line = reader.line_num
+                transaction, error = self._parse_row(user_id, row, mapping)
+                if error:
+                    result.failed += 1
+                    if len(result.errors) < MAX_REPORTED_ERRORS:
+                        result.errors.append({'line': line, 'message': error})
+                    continue
+
+                key = self._row_key(transaction)
+                digest = hashlib.blake2b(key, digest_size=16).digest()
+                occurrences[digest] += 1
+                transaction.content_hash = hashlib.sha256(
+                    key + b'|' + str(occurrences[digest]).encode()
+                ).hexdigest()
+
+                chunk.append(transaction)
+                if len(chunk) >= chunk_size:
+                    self._flush(chunk, result)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # line_num only counts lines read successfully
+            message = ("File must be UTF-8 encoded text" if isinstance(e, UnicodeDecodeError)
+                       else f"File is not valid CSV: {e}")
+            result.errors.append({'line': reader.line_num + 1, 'message': message})
+
+        self._flush(chunk, result)
+        return result
+
+    def _flush(self, chunk: List[Transaction], result: ImportResult):
+        """Insert one chunk and commit it."""
+        if not chunk:
+            return
+        inserted = self.transaction_repository.import_many(chunk)
+        self.transaction_repository.commit()
+        result.imported += inserted
+        result.duplicates += len(chunk) - inserted
+
+    def _parse_row(self, user_id: int, row: Dict, mapping: ColumnMapping) -> tuple[Optional[Transaction], Optional[str]]:
+        """Convert one CSV row to an unsaved Transaction, or explain why not."""
+        def column(name: Optional[str], default: str = '') -> str:
+            value = row.get(name) if name else None
+            return value.strip() if value and value.strip() else default
+
+        date = column(mapping.date)
+        if mapping.date_format != '%Y-%m-%d' or not is_iso_date(date):
+            try:
+                date = datetime.strptime(date, mapping.date_format).strftime('%Y-%m-%d')
+            except ValueError:
+                return None, f"Date must match {mapping.date_format}"
+
+        raw_amount = column(mapping.amount).replace(',', '').lstrip('₹$€£')
+        try:
+            amount = float(raw_amount) if raw_amount else None
+        except ValueError:
+            return None, "Amount must be a valid number"
+        if amount is not None and not math.isfinite(amount):
+            return None, "Amount must be a valid number"
+
+        transaction_type = column(mapping.transaction_type, mapping.default_transaction_type).lower()
+        if mapping.signed_amounts and amount is not None:
+            transaction_type = 'expense' if amount < 0 else 'income'
+            amount = abs(amount)
+
+        success, message, transaction = self.transaction_service.build_transaction(
+            user_id=user_id,
+            amount=amount,
+            category=column(mapping.category, mapping.default_category),
+            date=date,
+            description=column(mapping.description) or None,
+            payment_method=column(mapping.payment_method, mapping.default_payment_method),
+            transaction_type=transaction_type
+        )
+        return (transaction, None) if success else (None, message)
+
+    @staticmethod
+    def _row_key(transaction: Transaction) -> bytes:
+        """Identity of a row's content, used for duplicate detection."""
+        parts = (
+            str(transaction.user_id), transaction.date, f"{transaction.amount:.2f}",
+            transaction.transaction_type.value, transaction.category,
+            transaction.payment_method, transaction.description or '',
+        )
+        return '\x1f'.join(parts).encode()
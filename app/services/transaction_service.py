@@ -1,18 +1,27 @@
 """
 Transaction service for handling transaction-related business logic.
 """
-from typing import List, Optional, Dict
-from datetime import datetime
+import base64
+import calendar
+import json
+import math
+from typing import List, Optional, Dict, Tuple, Iterator, Union
+from datetime import date as date_type
 
-from app.models import Transaction, TransactionType, FinancialSummary
+from config.settings import config
+from app.models import (Transaction, TransactionType, FinancialSummary, TransactionPage,
+                        TransactionFilter, TransactionSearchHit, TransactionSort, Granularity, to_cents)
+from app.models.frame import TransactionFrame
 from app.repositories.transaction_repository import TransactionRepository
+from app.services.cache import AnalyticsCache, analytics_cache
 
 
 class TransactionService:
     """Service for transaction-related operations."""
     
-    def __init__(self, transaction_repository: TransactionRepository = None):
+    def __init__(self, transaction_repository: TransactionRepository = None, cache: AnalyticsCache = None):
         self.transaction_repository = transaction_repository or TransactionRepository()
+        self.cache = cache or analytics_cache
     
     def create_transaction(self, user_id: int, amount: float, category: str, date: str,
                           description: str, payment_method: str, transaction_type: str) -> tuple[bool, str, Optional[Transaction]]:
@@ -22,42 +31,170 @@ class TransactionService:
         Returns:
             tuple: (success, message, transaction_object)
         """
+        success, message, transaction = self.build_transaction(
+            user_id, amount, category, date, description, payment_method, transaction_type
+        )
+        if not success:
+            return False, message, None
+        
         try:
-            # Validate inputs
-            if not category or amount is None:
-                return False, "Category and amount are required", None
+            # Save to database
+            created_transaction = self.transaction_repository.create(transaction)
+            return True, "Transaction added successfully", created_transaction
             
-            if amount <= 0:
-                return False, "Amount must be greater than zero", None
+        except Exception as e:
+            return False, f"Failed to create transaction: {str(e)}", None
+    
+    def create_transactions(self, user_id: int, rows: List[Dict]) -> tuple[List[Transaction], List[Dict]]:
+        """
+        Validate a batch of transactions and insert the valid ones together.
+        
+        Each row is a dict with the ``create_transaction`` fields (``notes`` is
+        accepted as an alias for ``description``). Valid rows are inserted with
+        a single executemany in one database transaction; invalid rows are
+        skipped.
+        
+        Returns:
+            tuple: (created_transactions, errors) where each error is
+            ``{'index': row_index, 'message': reason}``
+        """
+        valid, errors = [], []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.append({'index': index, 'message': "Each transaction must be an object"})
+                continue
             
-            # Validate date format
             try:
-                datetime.strptime(date, '%Y-%m-%d')
-            except ValueError:
-                return False, "Date must be in YYYY-MM-DD format", None
+                amount = float(row['amount']) if row.get('amount') not in (None, '') else None
+            except (TypeError, ValueError):
+                errors.append({'index': index, 'message': "Amount must be a valid number"})
+                continue
             
-            # Create transaction object
-            transaction = Transaction(
+            success, message, transaction = self.build_transaction(
                 user_id=user_id,
                 amount=amount,
-                category=category,
-                date=date,
-                description=description,
-                payment_method=payment_method,
-                transaction_type=TransactionType(transaction_type)
+                category=str(row.get('category') or '').strip(),
+                date=str(row.get('date') or '').strip(),
+                description=row.get('description', row.get('notes')),
+                payment_method=str(row.get('payment_method') or '').strip(),
+                transaction_type=str(row.get('transaction_type') or 'expense').strip()
             )
-            
-            # Save to database
-            created_transaction = self.transaction_repository.create(transaction)
-            return True, "Transaction added successfully", created_transaction
-            
+            if success:
+                valid.append(transaction)
+            else:
+                errors.append({'index': index, 'message': message})
+        
+        if not valid:
+            return [], errors
+        
+        try:
+            return self.transaction_repository.create_many(valid), errors
         except Exception as e:
-            return False, f"Failed to create transaction: {str(e)}", None
+            message = f"Failed to create transactions: {str(e)}"
+            return [], errors + [{'index': None, 'message': message}]
+    
+    def build_transaction(self, user_id: int, amount: float, category: str, date: str,
+                          description: str, payment_method: str, transaction_type: str) -> tuple[bool, str, Optional[Transaction]]:
+        """
+        Validate transaction fields and build an unsaved Transaction.
+        
+        Every way of adding transactions goes through these rules.
+        
+        Returns:
+            tuple: (success, message, transaction_object)
+        """
+        # Validate inputs
+        if not category or amount is None:
+            return False, "Category and amount are required", None
+        
+        # float() accepts 'nan' and 'inf', which cannot be stored as cents
+        if not math.isfinite(amount):
+            return False, "Amount must be a valid number", None
+        
+        if amount <= 0:
+            return False, "Amount must be greater than zero", None
+        
+        try:
+            to_cents(amount)
+        except ValueError:
+            return False, "Amount is too large", None
+        
+        # Validate date format
+        if not is_iso_date(date):
+            return False, "Date must be in YYYY-MM-DD format", None
+        
+        try:
+            transaction_type = TransactionType(transaction_type)
+        except ValueError:
+            return False, "Transaction type must be 'income' or 'expense'", None
+        
+        # Create transaction object
+        transaction = Transaction(
+            user_id=user_id,
+            amount=amount,
+            category=category,
+            date=date,
+            description=description,
+            payment_method=payment_method,
+            transaction_type=transaction_type
+        )
+        return True, "Transaction is valid", transaction
     
     def get_user_transactions(self, user_id: int) -> List[Transaction]:
         """Get all transactions for a user."""
         return self.transaction_repository.get_by_user_id(user_id)
     
+    def iter_user_transactions(self, user_id: int) -> Iterator[Transaction]:
+        """
+        Lazily yield all transactions for a user, newest first.
+        
+        Memory stays flat regardless of history size; use this instead of
+        ``get_user_transactions`` for exports and whole-history reports.
+        """
+        return self.transaction_repository.iter_by_user_id(user_id)
+    
+    def get_transactions_page(self, user_id: int, page_token: str = None, page_size: int = None,
+                              filters: TransactionFilter = None) -> TransactionPage:
+        """
+        Get one page of a user's transactions matching ``filters`` (default:
+        all of them, newest first).
+        
+        Raises:
+            ValueError: if ``page_token`` is malformed or from another sort order
+        """
+        filters = filters or TransactionFilter()
+        page_size = min(max(page_size or config.page_size, 1), config.max_page_size)
+        after = decode_page_token(page_token) if page_token else None
+        if after and not isinstance(after[0], _SORT_KEY_TYPES[filters.sort]):
+            raise ValueError("Invalid page token")
+        
+        # Fetch one extra row to learn whether another page follows
+        transactions = self.transaction_repository.query(user_id, filters, page_size + 1, after)
+        next_page_token = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            last = transactions[-1]
+            next_page_token = encode_page_token(_sort_key(last, filters.sort), last.id)
+        
+        return TransactionPage(transactions=transactions, next_page_token=next_page_token)
+    
+    def search_transactions(self, user_id: int, text: str, filters: TransactionFilter = None,
+                            limit: int = None) -> List[TransactionSearchHit]:
+        """
+        Full-text search of a user's transaction descriptions, best match
+        first, narrowed by ``filters`` (whose sort order is ignored).
+        """
+        limit = min(max(limit or config.page_size, 1), config.max_page_size)
+        return self.transaction_repository.search(user_id, text, filters, limit)
+    
+    def get_user_categories(self, user_id: int) -> List[str]:
+        """Get the names of a user's categories, for filter choices."""
+        return [category.name for category in self.transaction_repository.categories.get_by_user_id(user_id)]
+    
+    def get_payment_methods(self) -> List[str]:
+        """Get the names of all payment methods, for filter choices."""
+        return sorted(self.transaction_repository.categories.get_payment_method_names().values())
+    
     def get_transaction_by_id(self, transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID."""
         return self.transaction_repository.get_by_id(transaction_id)
@@ -69,20 +206,13 @@ class TransactionService:
         Returns:
             tuple: (success, message)
         """
-        # Verify ownership
-        transaction = self.transaction_repository.get_by_id(transaction_id)
-        if not transaction:
-            return False, "Transaction not found"
-        
-        if transaction.user_id != user_id:
-            return False, "Unauthorized to delete this transaction"
-        
         try:
-            success = self.transaction_repository.delete(transaction_id)
+            # Ownership is enforced by the DELETE itself, in a single round trip
+            success = self.transaction_repository.delete_for_user(transaction_id, user_id)
             if success:
                 return True, "Transaction deleted successfully"
             else:
-                return False, "Failed to delete transaction"
+                return False, "Transaction not found or unauthorized"
         except Exception as e:
             return False, f"Error deleting transaction: {str(e)}"
     
@@ -93,84 +223,223 @@ class TransactionService:
         Returns:
             tuple: (success, message)
         """
-        # Verify ownership
-        existing_transaction = self.transaction_repository.get_by_id(transaction.id)
-        if not existing_transaction or existing_transaction.user_id != user_id:
-            return False, "Unauthorized to update this transaction"
-        
         try:
-            self.transaction_repository.update(transaction)
-            return True, "Transaction updated successfully"
+            # Ownership is enforced by the UPDATE itself, in a single round trip
+            success = self.transaction_repository.update_for_user(transaction, user_id)
+            if success:
+                return True, "Transaction updated successfully"
+            else:
+                return False, "Unauthorized to update this transaction"
         except Exception as e:
             return False, f"Error updating transaction: {str(e)}"
     
     def get_financial_summary(self, user_id: int) -> FinancialSummary:
         """Get comprehensive financial summary for a user."""
-        # Get totals by type
-        total_income = self.transaction_repository.get_total_by_type(user_id, TransactionType.INCOME)
-        total_expense = self.transaction_repository.get_total_by_type(user_id, TransactionType.EXPENSE)
-        
-        # Get category breakdowns
-        income_by_category = self.transaction_repository.get_category_totals(user_id, TransactionType.INCOME)
-        expense_by_category = self.transaction_repository.get_category_totals(user_id, TransactionType.EXPENSE)
+        return self.cache.get_or_compute(
+            user_id, 'financial_summary', lambda: self._compute_financial_summary(user_id),
+            db_path=self.transaction_repository.db_path
+        )
+    
+    def get_transaction_frame(self, user_id: int) -> TransactionFrame:
+        """
+        Get the user's transactions as a columnar frame.
         
-        # Get payment method breakdown (for expenses only)
-        expense_transactions = self.transaction_repository.get_by_user_and_type(user_id, TransactionType.EXPENSE)
-        expense_by_payment_method = {}
-        for transaction in expense_transactions:
-            method = transaction.payment_method
-            expense_by_payment_method[method] = expense_by_payment_method.get(method, 0) + transaction.amount
+        Loaded once per data version and shared by every analytic below.
+        """
+        return self.cache.get_or_compute(
+            user_id, 'transaction_frame', lambda: self.transaction_repository.load_frame(user_id),
+            db_path=self.transaction_repository.db_path
+        )
+    
+    def _compute_financial_summary(self, user_id: int) -> FinancialSummary:
+        """Compute the financial summary from the transaction frame."""
+        frame = self.get_transaction_frame(user_id)
+        income = frame.mask(transaction_type=TransactionType.INCOME)
+        expense = frame.mask(transaction_type=TransactionType.EXPENSE)
         
         return FinancialSummary(
-            total_income=total_income,
-            total_expense=total_expense,
-            income_by_category=income_by_category,
-            expense_by_category=expense_by_category,
-            expense_by_payment_method=expense_by_payment_method
+            total_income=frame.total(income),
+            total_expense=frame.total(expense),
+            income_by_category=frame.totals_by_category(income),
+            expense_by_category=frame.totals_by_category(expense),
+            expense_by_payment_method=frame.totals_by_method(expense)
         )
     
-    def get_daily_spending_data(self, user_id: int) -> Dict:
-        """Get daily spending data for charts."""
-        expense_transactions = self.transaction_repository.get_by_user_and_type(user_id, TransactionType.EXPENSE)
-        
-        daily_totals = {}
-        for transaction in expense_transactions:
-            date = transaction.date
-            daily_totals[date] = daily_totals.get(date, 0) + transaction.amount
-        
-        # Sort by date
-        sorted_data = sorted(daily_totals.items())
-        
+    def get_spending_series(self, user_id: int, granularity: Granularity = Granularity.DAY,
+                            start_date: str = None, end_date: str = None) -> Dict:
+        """
+        Get expense totals per day, week, month, quarter or year for charts,
+        optionally limited to a date window.
+        """
+        return self.cache.get_or_compute(
+            user_id, 'spending_series',
+            lambda: self._compute_spending_series(user_id, granularity, start_date, end_date),
+            granularity, start_date, end_date, db_path=self.transaction_repository.db_path
+        )
+    
+    def _compute_spending_series(self, user_id: int, granularity: Granularity,
+                                 start_date: Optional[str], end_date: Optional[str]) -> Dict:
+        """Compute a spending series; buckets are grouped in SQL, only labels here."""
+        totals = self.transaction_repository.get_bucketed_totals(
+            user_id, TransactionType.EXPENSE, granularity, start_date, end_date
+        )
         return {
-            'labels': [item[0] for item in sorted_data],
-            'amounts': [item[1] for item in sorted_data]
+            'labels': [_bucket_label(bucket, granularity) for bucket, _ in totals],
+            'amounts': [amount for _, amount in totals]
         }
     
+    def get_daily_spending_data(self, user_id: int) -> Dict:
+        """Get daily spending data for charts."""
+        return self.get_spending_series(user_id, Granularity.DAY)
+    
     def get_monthly_spending_data(self, user_id: int) -> Dict:
-        """Get monthly spending data for charts."""
-        expense_transactions = self.transaction_repository.get_by_user_and_type(user_id, TransactionType.EXPENSE)
-        
-        monthly_totals = {}
-        for transaction in expense_transactions:
-            # Extract year-month from date
-            date_parts = transaction.date.split('-')
-            if len(date_parts) >= 2:
-                year_month = f"{date_parts[0]}-{date_parts[1]}"
-                monthly_totals[year_month] = monthly_totals.get(year_month, 0) + transaction.amount
-        
-        # Sort by date and format labels
-        sorted_data = sorted(monthly_totals.items())
-        
-        # Format month labels
-        formatted_labels = []
-        for year_month, amount in sorted_data:
-            try:
-                date_obj = datetime.strptime(year_month, '%Y-%m')
-                formatted_labels.append(date_obj.strftime('%b %Y'))
-            except ValueError:
-                formatted_labels.append(year_month)
-        
-        return {
-            'labels': formatted_labels,
-            'amounts': [item[1] for item in sorted_data]
-        }
\ No newline at end of file
+        """Get monthly spending data for charts, labelled like 'Jan 2024'."""
+        return self.get_spending_series(user_id, Granularity.MONTH)
+
+
+def is_iso_date(value: str) -> bool:
+    """Check that a value is a real calendar date written as YYYY-MM-DD."""
+    # date.fromisoformat is several times faster than strptime, which matters
+    # for bulk imports; the shape check keeps it to this one ISO form
+    try:
+        return len(value) == 10 and value[4] == value[7] == '-' and bool(date_type.fromisoformat(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def encode_page_token(key: Union[str, int], transaction_id: int) -> str:
+    """Encode a (sort key, id) keyset position as an opaque URL-safe token."""
+    raw = json.dumps([key, transaction_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_page_token(token: str) -> Tuple[Union[str, int], int]:
+    """
+    Decode a token produced by ``encode_page_token``.
+    
+    Raises:
+        ValueError: if the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(key, bool) or not isinstance(key, (str, int)):
+            raise TypeError(key)
+        return key, int(transaction_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid page token") from e
+
+
+# Keyset sort keys: dates for date orders, amounts in cents for amount orders
+_SORT_KEY_TYPES = {
+    TransactionSort.DATE_DESC: str,
+    TransactionSort.DATE_ASC: str,
+    TransactionSort.AMOUNT_DESC: int,
+    TransactionSort.AMOUNT_ASC: int,
+}
+
+
+def _sort_key(transaction: Transaction, sort: TransactionSort) -> Union[str, int]:
+    return transaction.date if _SORT_KEY_TYPES[sort] is str else to_cents(transaction.amount)
+
+
+def _bucket_label(bucket: str, granularity: Granularity) -> str:
+    """Chart label for a bucket: 'Jan 2024' for months, 'Q1 2024' for quarters."""
+    if granularity == Granularity.MONTH:
+        return f"{calendar.month_abbr[int(bucket[5:7])]} {bucket[:4]}"
+    if granularity == Granularity.QUARTER:
+        return f"{bucket[5:]} {bucket[:4]}"
+    return bucket
+
+
+def parse_series_args(args, default: Granularity) -> Tuple[Granularity, Optional[str], Optional[str]]:
+    """
+    Read ``granularity``, ``start`` and ``end`` query-string arguments for a
+    spending series.
+    
+    Raises:
+        ValueError: if a value is invalid
+    """
+    start_date = (args.get('start') or '').strip() or None
+    end_date = (args.get('end') or '').strip() or None
+    for date in (start_date, end_date):
+        if date and not is_iso_date(date):
+            raise ValueError("Dates must be in YYYY-MM-DD format")
+    
+    raw = (args.get('granularity') or '').strip()
+    try:
+        granularity = Granularity(raw) if raw else default
+    except ValueError:
+        raise ValueError(f"Granularity must be one of: {', '.join(g.value for g in Granularity)}") from None
+    return granularity, start_date, end_date
+
+
+def parse_transaction_filter(args) -> TransactionFilter:
+    """
+    Build a TransactionFilter from query-string arguments (a MultiDict).
+    
+    ``start``, ``end``, ``type``, ``min_amount``, ``max_amount`` and ``sort``
+    are single values; ``category`` and ``payment_method`` may repeat. Empty
+    values are ignored.
+    
+    Raises:
+        ValueError: if a value is invalid
+    """
+    def value(name: str) -> Optional[str]:
+        raw = (args.get(name) or '').strip()
+        return raw or None
+    
+    def amount(name: str) -> Optional[float]:
+        raw = value(name)
+        if raw is None:
+            return None
+        try:
+            parsed = float(raw)
+        except ValueError:
+            raise ValueError("Amounts must be valid numbers") from None
+        if parsed < 0 or not math.isfinite(parsed):
+            raise ValueError("Amounts must be valid numbers")
+        # Compared against stored cents, so it must fit in them too
+        to_cents(parsed)
+        return parsed
+    
+    start_date, end_date = value('start'), value('end')
+    for date in (start_date, end_date):
+        if date and not is_iso_date(date):
+            raise ValueError("Dates must be in YYYY-MM-DD format")
+    
+    try:
+        transaction_type = TransactionType(value('type')) if value('type') else None
+    except ValueError:
+        raise ValueError("Transaction type must be 'income' or 'expense'") from None
+    
+    try:
+        sort = TransactionSort(value('sort')) if value('sort') else TransactionSort.DATE_DESC
+    except ValueError:
+        raise ValueError(f"Sort must be one of: {', '.join(s.value for s in TransactionSort)}") from None
+    
+    return TransactionFilter(
+        start_date=start_date,
+        end_date=end_date,
+        categories=[c.strip() for c in args.getlist('category') if c.strip()],
+        payment_methods=[m.strip() for m in args.getlist('payment_method') if m.strip()],
+        transaction_type=transaction_type,
+        min_amount=amount('min_amount'),
+        max_amount=amount('max_amount'),
+        sort=sort
+    )
+
+
+def transaction_filter_args(filters: TransactionFilter) -> Dict:
+    """The query-string arguments that ``parse_transaction_filter`` reads back as ``filters``."""
+    args = {
+        'start': filters.start_date,
+        'end': filters.end_date,
+        'category': filters.categories,
+        'payment_method': filters.payment_methods,
+        'type': filters.transaction_type.value if filters.transaction_type else None,
+        'min_amount': filters.min_amount,
+        'max_amount': filters.max_amount,
+        'sort': filters.sort.value if filters.sort != TransactionSort.DATE_DESC else None,
+    }
+    return {name: arg for name, arg in args.items() if arg not in (None, [])}
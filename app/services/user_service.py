@@ -54,6 +54,10 @@ class UserService:
         """Get user by ID."""
         return self.user_repository.get_by_id(user_id)
     
+    def get_data_version(self, user_id: int) -> int:
+        """Get the version counter bumped on every write to the user's data."""
+        return self.user_repository.get_data_version(user_id)
+    
     def update_user_profile(self, user: User) -> tuple[bool, str]:
         """
         Update user profile.
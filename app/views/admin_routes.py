@@ -0,0 +1,78 @@
+"""
+Request profiling and the admin pages that show the results.
+
+Nothing here is active unless ``config.profiling_enabled`` is set. Admins
+then profile a request by sending ``X-Profile: 1`` (or every request is
+profiled with ``config.profile_all_requests``), and the pages are answered
+only to admins who also pass ``token_allowed`` with ``config.profiling_token``.
+"""
+from flask import Blueprint, abort, g, render_template, request, session
+
+from config.settings import config
+from app.profiling import RequestProfiler, profile_store
+from app.views.metrics_routes import token_allowed
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+# Header an admin sends to have a single request profiled
+PROFILE_HEADER = 'X-Profile'
+
+
+def is_admin() -> bool:
+    """Whether the logged-in user is listed in ``config.admin_users`` and passes the profiling token check."""
+    return session.get('username') in config.admin_users and token_allowed(config.profiling_token)
+
+
+def _should_profile() -> bool:
+    if not config.profiling_enabled:
+        return False
+    if request.blueprint == 'admin' or request.endpoint in (None, 'static'):
+        return False
+    if config.profile_all_requests:
+        return True
+    return request.headers.get(PROFILE_HEADER) == '1' and is_admin()
+
+
+@admin_bp.before_app_request
+def _start_profiler():
+    if _should_profile():
+        # None when another request is already being profiled
+        g.profiler = RequestProfiler.try_start()
+
+
+@admin_bp.after_app_request
+def _store_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profile_store.add(profiler.stop(request.endpoint, request.full_path.rstrip('?'), request.method))
+    return response
+
+
+@admin_bp.teardown_app_request
+def _discard_profiler(exc):
+    # A request that never reached after_request must still release tracemalloc
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop(request.endpoint, request.path, request.method)
+
+
+@admin_bp.before_request
+def _admin_only():
+    if not config.profiling_enabled or not is_admin():
+        abort(404)
+
+
+@admin_bp.route('/profiles')
+def profiles():
+    """Recent profiles of every endpoint."""
+    return render_template('admin_profiles.html', endpoints=profile_store.by_endpoint(),
+                           profile_all_requests=config.profile_all_requests)
+
+
+@admin_bp.route('/profiles/<int:profile_id>')
+def profile(profile_id):
+    """Allocation sites and call profile of one request."""
+    found = profile_store.get(profile_id)
+    if found is None:
+        abort(404)
+    return render_template('admin_profile.html', profile=found)
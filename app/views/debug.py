@@ -0,0 +1,59 @@
+"""
+Per-request SQL instrumentation: Server-Timing headers and the debug toolbar.
+"""
+import logging
+import time
+
+from flask import Flask, g, render_template
+
+from config.settings import config
+from app.repositories.instrumentation import QueryLog, push_query_log, pop_query_log, slow_query_logger
+
+
+def init_app(app: Flask):
+    """
+    Record the SQL of every request and report it on the response.
+
+    Each response gets a ``Server-Timing`` header with the time spent in SQL
+    (``db``, with the statement count) and in the whole request (``app``).
+    With ``config.debug_toolbar`` HTML pages also get a collapsible panel
+    listing the request's statements.
+    """
+    if config.database.slow_query_log and not slow_query_logger.handlers:
+        handler = logging.FileHandler(config.database.slow_query_log)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_query_logger.addHandler(handler)
+
+    @app.before_request
+    def _start_query_log():
+        g.query_log = QueryLog()
+        g.query_log_token = push_query_log(g.query_log)
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _report_query_log(response):
+        log = g.get('query_log')
+        if log is None:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = (
+            f'db;dur={log.duration * 1000:.2f};desc="{log.count} queries", app;dur={elapsed * 1000:.2f}'
+        )
+        if config.debug_toolbar and response.mimetype == 'text/html' and not response.is_streamed:
+            _inject_toolbar(response, log, elapsed)
+        return response
+
+    @app.teardown_request
+    def _stop_query_log(exc):
+        token = g.pop('query_log_token', None)
+        if token is not None:
+            pop_query_log(token)
+
+
+def _inject_toolbar(response, log: QueryLog, elapsed: float):
+    body = response.get_data(as_text=True)
+    end = body.rfind('</body>')
+    if end == -1:
+        return
+    toolbar = render_template('sql_toolbar.html', log=log, elapsed=elapsed)
+    response.set_data(body[:end] + toolbar + body[end:])
@@ -1,10 +1,14 @@
 """
 Main application routes for dashboard and core functionality.
 """
-from flask import Blueprint, render_template, session, redirect, url_for, jsonify
+import hashlib
+from functools import wraps
+
+from flask import Blueprint, render_template, request, session, redirect, url_for, jsonify, make_response
 
 from app.services.user_service import UserService
-from app.services.transaction_service import TransactionService
+from app.models import Granularity
+from app.services.transaction_service import TransactionService, parse_series_args
 from app.services.budget_service import BudgetService
 
 main_bp = Blueprint('main', __name__)
@@ -23,6 +27,31 @@ def login_required(func):
     return wrapper
 
 
+def etag_by_data_version(func):
+    """
+    Decorator for per-user JSON endpoints: derive a strong ETag from the user's
+    data version and answer a matching If-None-Match with 304 before the view
+    (and any service work) runs.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        user_id = session['user_id']
+        version = user_service.get_data_version(user_id)
+        key = f"{request.endpoint}|{request.query_string.decode()}|{user_id}|{version}"
+        etag = hashlib.sha1(key.encode()).hexdigest()
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(func(*args, **kwargs))
+        
+        response.set_etag(etag)
+        # Browsers may keep the payload but must revalidate it on every use
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
+
 @main_bp.route('/')
 @login_required
 def index():
@@ -72,24 +101,36 @@ def statistics():
 
 @main_bp.route('/daily_spending_data')
 @login_required
+@etag_by_data_version
 def daily_spending_data():
-    """API endpoint for daily spending chart data."""
-    user_id = session['user_id']
-    data = transaction_service.get_daily_spending_data(user_id)
-    return jsonify(data)
+    """
+    API endpoint for daily spending chart data.
+    
+    Optional ``start`` and ``end`` (YYYY-MM-DD) limit the window and
+    ``granularity`` (day, week, month, quarter, year) changes the buckets.
+    """
+    return _spending_series(Granularity.DAY)
 
 
 @main_bp.route('/monthly_spending_data')
 @login_required
+@etag_by_data_version
 def monthly_spending_data():
-    """API endpoint for monthly spending chart data."""
-    user_id = session['user_id']
-    data = transaction_service.get_monthly_spending_data(user_id)
-    return jsonify(data)
+    """API endpoint for monthly spending chart data; takes the same arguments."""
+    return _spending_series(Granularity.MONTH)
+
+
+def _spending_series(default: Granularity):
+    try:
+        granularity, start_date, end_date = parse_series_args(request.args, default)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(transaction_service.get_spending_series(session['user_id'], granularity, start_date, end_date))
 
 
 @main_bp.route('/budget_warnings')
 @login_required
+@etag_by_data_version
 def budget_warnings_api():
     """API endpoint for budget warnings."""
     user_id = session['user_id']
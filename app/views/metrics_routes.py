@@ -0,0 +1,94 @@
+"""
+Prometheus metrics endpoint and request timing.
+"""
+import hmac
+import time
+from typing import Optional
+
+from flask import Blueprint, Response, abort, g, request
+
+from config.settings import config
+from app.metrics import metrics, request_duration
+from app.repositories.category_repository import lookup_cache_stats
+from app.repositories.pool import pool_stats
+from app.services.cache import analytics_cache
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Without a token, scrapes are only answered on the machine itself
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def token_allowed(token: Optional[str]) -> bool:
+    """
+    Whether the request may see an opt-in diagnostics endpoint.
+
+    With ``token`` set the request must send it as a bearer token, which
+    holds up behind a reverse proxy; without one only loopback requests
+    are answered.
+    """
+    if token:
+        sent = request.headers.get('Authorization', '')
+        return hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode())
+    return request.remote_addr in LOCAL_ADDRESSES
+
+
+@metrics_bp.before_app_request
+def _start_request_timer():
+    g.metrics_started = time.perf_counter()
+
+
+@metrics_bp.after_app_request
+def _record_request_duration(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        metrics.observe(request_duration, time.perf_counter() - started,
+                        request.endpoint or 'unmatched', request.method, str(response.status_code))
+    return response
+
+
+@metrics_bp.route('/metrics')
+def metrics_endpoint():
+    """All application metrics in the Prometheus text format, when enabled."""
+    if not config.metrics_enabled or not token_allowed(config.metrics_token):
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _caches():
+    return {'analytics': analytics_cache.stats(), 'lookups': lookup_cache_stats()}
+
+
+def _cache_lookups():
+    for cache, stats in _caches().items():
+        yield (('cache', cache), ('result', 'hit')), stats['hits']
+        yield (('cache', cache), ('result', 'miss')), stats['misses']
+
+
+def _cache_hit_ratio():
+    for cache, stats in _caches().items():
+        lookups = stats['hits'] + stats['misses']
+        yield (('cache', cache),), stats['hits'] / lookups if lookups else 0.0
+
+
+def _cache_entries():
+    for cache, stats in _caches().items():
+        yield (('cache', cache),), stats['entries']
+
+
+def _pool_connections():
+    for database, stats in pool_stats().items():
+        yield (('database', database), ('state', 'idle')), stats['idle']
+        yield (('database', database), ('state', 'in_use')), stats['in_use']
+
+
+def _pool_size():
+    for database, stats in pool_stats().items():
+        yield (('database', database),), stats['size']
+
+
+metrics.callback('finance_cache_lookups_total', 'counter', 'Cache lookups by cache and result.', _cache_lookups)
+metrics.callback('finance_cache_hit_ratio', 'gauge', 'Share of cache lookups that hit, since start.', _cache_hit_ratio)
+metrics.callback('finance_cache_entries', 'gauge', 'Entries currently held per cache.', _cache_entries)
+metrics.callback('finance_pool_connections', 'gauge', 'Open pooled connections by state.', _pool_connections)
+metrics.callback('finance_pool_size', 'gauge', 'Maximum connections per pool.', _pool_size)
@@ -1,13 +1,26 @@
 """
 Transaction management routes.
 """
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+import io
+import json
 
-from app.services.transaction_service import TransactionService
+from flask import (Blueprint, abort, render_template, request, redirect, url_for, session, flash, jsonify,
+                   Response, stream_with_context)
+from markupsafe import Markup, escape
+
+from config.settings import config
+from app.repositories.transaction_repository import SNIPPET_START, SNIPPET_END
+from app.services.transaction_service import TransactionService, parse_transaction_filter, transaction_filter_args
+from app.services.import_service import ImportService, ColumnMapping
+from app.services.export_service import ExportService
 from app.views.main_routes import login_required
 
 transaction_bp = Blueprint('transactions', __name__)
 transaction_service = TransactionService()
+import_service = ImportService(transaction_service)
+export_service = ExportService(transaction_service.transaction_repository)
+
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
 
 
 @transaction_bp.route('/transactions')
@@ -17,28 +30,105 @@ def transactions():
     user_id = session['user_id']
     username = session['username']
     
-    # Get all transactions for the user
-    user_transactions = transaction_service.get_user_transactions(user_id)
+    try:
+        filters = parse_transaction_filter(request.args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('transactions.transactions'))
+    filter_args = transaction_filter_args(filters)
+    search = request.args.get('q', '').strip()
+    
+    if search:
+        # Best matches first, with the matched words highlighted; no paging
+        hits = transaction_service.search_transactions(user_id, search, filters)
+        rows = [(hit.transaction, _highlight(hit.snippet)) for hit in hits]
+        next_page = None
+    else:
+        # Get one page of matching transactions for the user
+        try:
+            page = transaction_service.get_transactions_page(user_id, request.args.get('page'), filters=filters)
+        except ValueError:
+            flash('That page link is no longer valid.', 'error')
+            return redirect(url_for('transactions.transactions', **filter_args))
+        rows = [(transaction, transaction.description) for transaction in page.transactions]
+        next_page = page.next_page_token
     
     # Convert to list of tuples for template compatibility
     transactions_data = []
-    for transaction in user_transactions:
+    for transaction, description in rows:
         transactions_data.append((
             transaction.id,                    # 0
             transaction.user_id,               # 1
             transaction.amount,                # 2
             transaction.category,              # 3
             transaction.date,                  # 4
-            transaction.description,           # 5
+            description,                       # 5
             transaction.payment_method,        # 6
             transaction.transaction_type.value # 7
         ))
     
     return render_template('transaction.html',
                          transactions=transactions_data,
+                         next_page=next_page,
+                         is_first_page='page' not in request.args,
+                         filters=filters,
+                         filter_args=filter_args,
+                         search=search,
+                         categories=transaction_service.get_user_categories(user_id),
+                         payment_methods=transaction_service.get_payment_methods(),
                          username=username)
 
 
+@transaction_bp.route('/api/transactions')
+@login_required
+def transactions_api():
+    """
+    API endpoint returning one page of transactions, for infinite scroll.
+    
+    Accepts the same filters as the transactions page: start, end, category
+    and payment_method (repeatable), type, min_amount, max_amount and sort.
+    """
+    user_id = session['user_id']
+    
+    try:
+        page = transaction_service.get_transactions_page(
+            user_id,
+            request.args.get('page'),
+            request.args.get('limit', type=int),
+            parse_transaction_filter(request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'transactions': [_transaction_to_dict(t) for t in page.transactions],
+        'next_page': page.next_page_token
+    })
+
+
+@transaction_bp.route('/api/transactions/batch', methods=['POST'])
+@login_required
+def create_transactions_batch():
+    """API endpoint for bulk transaction ingestion with per-row errors."""
+    user_id = session['user_id']
+    
+    payload = request.get_json(silent=True)
+    rows = payload.get('transactions') if isinstance(payload, dict) else payload
+    if not isinstance(rows, list):
+        return jsonify({'error': 'Expected a JSON list of transactions'}), 400
+    if len(rows) > config.max_batch_size:
+        return jsonify({'error': f'At most {config.max_batch_size} transactions per batch'}), 413
+    
+    created, errors = transaction_service.create_transactions(user_id, rows)
+    
+    status = 201 if created else 400
+    return jsonify({
+        'created': len(created),
+        'ids': [t.id for t in created],
+        'errors': errors
+    }), status
+
+
 @transaction_bp.route('/add_transaction', methods=['POST'])
 @login_required
 def add_transaction():
@@ -77,6 +167,60 @@ def add_transaction():
     return redirect(url_for('transactions.transactions'))
 
 
+@transaction_bp.route('/import_transactions', methods=['POST'])
+@login_required
+def import_transactions():
+    """Import transactions from an uploaded CSV bank statement."""
+    user_id = session['user_id']
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('Choose a CSV file to import.', 'error')
+        return redirect(url_for('transactions.transactions'))
+    
+    try:
+        mapping_json = request.form.get('mapping', '').strip()
+        mapping = ColumnMapping.from_dict(json.loads(mapping_json)) if mapping_json else None
+    except (ValueError, TypeError) as e:
+        abort(400, description=f'Invalid column mapping: {e}')
+    
+    # Decode the upload as it is read instead of loading it into memory
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    result = import_service.import_csv(user_id, stream, mapping)
+    
+    flash(f'Imported {result.imported} transactions '
+          f'({result.duplicates} duplicates skipped, {result.failed} rows rejected).',
+          'success' if result.imported or not (result.failed or result.errors) else 'error')
+    for error in result.errors[:5]:
+        flash(f"Line {error['line']}: {error['message']}", 'error')
+    
+    return redirect(url_for('transactions.transactions'))
+
+
+@transaction_bp.route('/export_transactions')
+@login_required
+def export_transactions():
+    """Stream the user's transactions as CSV or NDJSON."""
+    user_id = session['user_id']
+    export_format = request.args.get('format', 'csv').lower()
+    
+    try:
+        chunks = export_service.stream(
+            user_id,
+            export_format,
+            start_date=request.args.get('start') or None,
+            end_date=request.args.get('end') or None,
+            category=request.args.get('category') or None
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # The generator reads rows from a server-side cursor as the client consumes them
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename=transactions.{export_format}'
+    return response
+
+
 @transaction_bp.route('/delete_transaction/<int:transaction_id>', methods=['POST'])
 @login_required
 def delete_transaction(transaction_id):
@@ -90,4 +234,23 @@ def delete_transaction(transaction_id):
     else:
         flash(message, 'error')
     
-    return redirect(url_for('transactions.transactions'))
\ No newline at end of file
+    return redirect(url_for('transactions.transactions'))
+
+
+def _highlight(snippet: str) -> Markup:
+    """Render a search snippet as HTML, escaping the text and marking the matches."""
+    html = str(escape(snippet or ''))
+    return Markup(html.replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>'))
+
+
+def _transaction_to_dict(transaction) -> dict:
+    """Convert a Transaction to its JSON representation."""
+    return {
+        'id': transaction.id,
+        'amount': transaction.amount,
+        'category': transaction.category,
+        'date': transaction.date,
+        'description': transaction.description,
+        'payment_method': transaction.payment_method,
+        'transaction_type': transaction.transaction_type.value
+    }
@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the Finance Tracker application.
+
+``datagen`` builds deterministic synthetic users, transactions and budgets;
+``run`` times the services and routes against them and compares the results
+with a stored baseline. See ``python -m benchmarks.run --help``.
+"""
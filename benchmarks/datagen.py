@@ -0,0 +1,160 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+The same seed always produces the same users, transactions and budgets, so
+timings from different runs are measured against identical data.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from app.models import Budget, BudgetPeriod, Transaction, TransactionType
+from app.repositories.budget_repository import BudgetRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.user_repository import UserRepository
+
+# (category, relative frequency, median amount, merchants) for everyday expenses
+EXPENSE_CATEGORIES = (
+    ('Food', 30, 12.0, ('Swiggy', 'Zomato', 'Cafe Coffee Day', 'Local bakery', 'Street food')),
+    ('Groceries', 18, 45.0, ('BigBasket', 'DMart', 'Reliance Fresh', 'Corner store')),
+    ('Travel', 14, 9.0, ('Uber', 'Ola', 'Metro card top-up', 'Rapido')),
+    ('Shopping', 9, 60.0, ('Amazon', 'Flipkart', 'Myntra', 'Decathlon')),
+    ('Entertainment', 7, 20.0, ('Netflix', 'BookMyShow', 'Spotify', 'Steam')),
+    ('Fuel', 6, 35.0, ('Indian Oil', 'HP petrol pump', 'Shell')),
+    ('Health', 4, 30.0, ('Apollo Pharmacy', 'Clinic visit', 'Gym membership')),
+    ('Utilities', 3, 50.0, ('Electricity bill', 'Water bill', 'Broadband', 'Mobile recharge')),
+    ('Education', 2, 80.0, ('Udemy', 'Bookstore', 'Course fee')),
+)
+# (category, amount, description) posted once a month
+MONTHLY_EXPENSES = (('Rent', 900.0, 'Monthly rent'),)
+MONTHLY_INCOME = (('Salary', 2500.0, 'Salary credit'),)
+OCCASIONAL_INCOME = (('Freelance', 300.0, 'Client payment'), ('Interest', 15.0, 'Savings interest'))
+
+PAYMENT_METHODS = (('UPI', 50), ('Card', 25), ('Cash', 15), ('Bank', 10))
+
+
+@dataclass
+class DatasetSpec:
+    """Shape of a synthetic dataset."""
+    users: int = 1
+    transactions_per_user: int = 1000
+    budgets_per_user: int = 5
+    seed: int = 0
+    # Transactions are spread over the ``days`` days ending on ``end_date``
+    end_date: date = date(2024, 12, 31)
+    days: int = 730
+
+
+@dataclass
+class GeneratedUser:
+    """A user created by ``generate``, with what was stored for it."""
+    user_id: int
+    username: str
+    transactions: int
+    budgets: int
+
+
+def build_transactions(rng: random.Random, user_id: int, count: int,
+                       end_date: date, days: int) -> List[Transaction]:
+    """
+    Build ``count`` transactions for one user, oldest first.
+
+    Salary and rent land on the first of every month in range; the rest are
+    everyday expenses with skewed category frequencies, log-normal amounts
+    and more activity at weekends, plus the odd extra income.
+    """
+    start = end_date - timedelta(days=days - 1)
+    transactions = []
+    month = date(start.year, start.month, 1)
+    while month <= end_date and len(transactions) < count:
+        if month >= start:
+            for kind, postings in ((TransactionType.INCOME, MONTHLY_INCOME),
+                                   (TransactionType.EXPENSE, MONTHLY_EXPENSES)):
+                for category, amount, description in postings:
+                    transactions.append(_transaction(user_id, amount, category, month, description, 'Bank', kind))
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    del transactions[count:]
+
+    categories = [c[0] for c in EXPENSE_CATEGORIES]
+    weights = [c[1] for c in EXPENSE_CATEGORIES]
+    by_name = {c[0]: c for c in EXPENSE_CATEGORIES}
+    methods, method_weights = zip(*PAYMENT_METHODS)
+    while len(transactions) < count:
+        day = start + timedelta(days=rng.randrange(days))
+        # Weekends are about half again as busy as weekdays
+        if day.weekday() < 5 and rng.random() < 1 / 3:
+            continue
+        if rng.random() < 0.02:
+            category, amount, description = rng.choice(OCCASIONAL_INCOME)
+            transactions.append(_transaction(user_id, round(amount * rng.uniform(0.5, 1.5), 2), category,
+                                             day, description, 'Bank', TransactionType.INCOME))
+            continue
+        category = rng.choices(categories, weights)[0]
+        _, _, median, merchants = by_name[category]
+        amount = max(round(rng.lognormvariate(0, 0.6) * median, 2), 0.01)
+        transactions.append(_transaction(user_id, amount, category, day, rng.choice(merchants),
+                                         rng.choices(methods, method_weights)[0], TransactionType.EXPENSE))
+
+    transactions.sort(key=lambda t: t.date)
+    return transactions
+
+
+def build_budgets(rng: random.Random, user_id: int, count: int, end_date: date) -> List[Budget]:
+    """Build up to ``count`` budgets on the most common expense categories."""
+    budgets = []
+    for category, _, median, _ in EXPENSE_CATEGORIES[:count]:
+        period = rng.choice((BudgetPeriod.MONTHLY, BudgetPeriod.YEARLY))
+        months = 1 if period == BudgetPeriod.MONTHLY else 12
+        start = date(end_date.year, end_date.month if months == 1 else 1, 1)
+        budgets.append(Budget(
+            user_id=user_id,
+            category=category,
+            allocated_amount=round(median * 20 * months * rng.uniform(0.8, 1.2), 2),
+            period=period,
+            start_date=start.isoformat(),
+            end_date=end_date.isoformat(),
+        ))
+    return budgets
+
+
+def generate(spec: DatasetSpec, prefix: str = 'bench') -> List[GeneratedUser]:
+    """
+    Create the users of ``spec`` with their transactions and budgets in the
+    configured database.
+
+    Usernames are ``{prefix}{seed}_{n}_{size}``; a user that already exists
+    is reused as is, so generating the same spec twice is cheap.
+    """
+    users, transactions, budgets = UserRepository(), TransactionRepository(), BudgetRepository()
+    generated = []
+    for n in range(spec.users):
+        username = f"{prefix}{spec.seed}_{n}_{spec.transactions_per_user}"
+        existing = users.get_by_username(username)
+        if existing is not None:
+            generated.append(GeneratedUser(existing.id, username, spec.transactions_per_user,
+                                           min(spec.budgets_per_user, len(EXPENSE_CATEGORIES))))
+            continue
+
+        user = users.create_user_with_hashed_password(username, f"{username}@example.com", '5550100', 'secret')
+        rng = random.Random(f"{spec.seed}:{n}")
+        rows = build_transactions(rng, user.id, spec.transactions_per_user, spec.end_date, spec.days)
+        for start in range(0, len(rows), 5000):
+            transactions.create_many(rows[start:start + 5000])
+        user_budgets = build_budgets(rng, user.id, spec.budgets_per_user, spec.end_date)
+        for budget in user_budgets:
+            budgets.create(budget)
+        generated.append(GeneratedUser(user.id, username, len(rows), len(user_budgets)))
+    return generated
+
+
+def date_range(spec: DatasetSpec) -> Tuple[str, str]:
+    """First and last date a dataset's transactions can fall on."""
+    return (spec.end_date - timedelta(days=spec.days - 1)).isoformat(), spec.end_date.isoformat()
+
+
+def _transaction(user_id: int, amount: float, category: str, day: date, description: str,
+                 payment_method: str, transaction_type: TransactionType) -> Transaction:
+    return Transaction(user_id=user_id, amount=amount, category=category, date=day.isoformat(),
+                       description=description, payment_method=payment_method,
+                       transaction_type=transaction_type)
@@ -0,0 +1,222 @@
+"""
+Time the services and read routes against synthetic data of several sizes.
+
+    python -m benchmarks.run --sizes 1000,10000,50000 --output results.json
+    python -m benchmarks.run --sizes 1000,10000,50000 --baseline results.json
+
+Each size is a transaction count per user; ``--users`` users of every size
+are generated (see ``benchmarks.datagen``) and the first one is measured.
+Results are written as JSON; with ``--baseline`` the median of every
+benchmark is compared against an earlier run and the exit status is 1 when
+any of them got slower by more than ``--tolerance``.
+
+Unless ``--database-dir`` is given the data lives in a fresh temporary
+directory, never in the application's own database. The analytics cache is
+cleared before every timed call, so timings are for computing results, not
+serving them from memory; pass ``--warm`` to keep it.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Read routes, timed through the Flask test client; writes would change the data
+ROUTES = (
+    '/',
+    '/statistics',
+    '/transactions',
+    '/transactions?q=uber',
+    '/transactions?category=Food&sort=amount_desc',
+    '/api/transactions?limit=500',
+    '/daily_spending_data',
+    '/daily_spending_data?start={window_start}',
+    '/monthly_spending_data',
+    '/monthly_spending_data?granularity=quarter',
+    '/budget_warnings',
+    '/budgets',
+    '/export_transactions?format=csv',
+)
+
+
+@dataclass
+class Timing:
+    """Summary of the repeated timings of one benchmark at one data size."""
+    name: str
+    size: int
+    runs: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_samples(cls, name: str, size: int, samples: List[float]) -> 'Timing':
+        ms = [sample * 1000 for sample in samples]
+        return cls(name, size, len(ms), round(min(ms), 3), round(statistics.median(ms), 3),
+                   round(statistics.fmean(ms), 3), round(max(ms), 3))
+
+
+def time_call(func: Callable[[], object], repeat: int, before: Callable[[], None] = None) -> List[float]:
+    """Wall-clock seconds of ``repeat`` calls, after one untimed warm-up call."""
+    samples = []
+    for run in range(repeat + 1):
+        if before:
+            before()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        if run:
+            samples.append(elapsed)
+    return samples
+
+
+def service_benchmarks(user_id: int, window_start: str) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, call) for every analytics service method, for one user."""
+    from app.models import Granularity
+    from app.services.budget_service import BudgetService
+    from app.services.transaction_service import TransactionService
+
+    transactions = TransactionService()
+    budgets = BudgetService(transaction_service=transactions)
+    return [
+        ('service.get_financial_summary', lambda: transactions.get_financial_summary(user_id)),
+        ('service.get_daily_spending_data', lambda: transactions.get_daily_spending_data(user_id)),
+        ('service.get_monthly_spending_data', lambda: transactions.get_monthly_spending_data(user_id)),
+        ('service.get_spending_series[week,90d]',
+         lambda: transactions.get_spending_series(user_id, Granularity.WEEK, window_start)),
+        ('service.get_transactions_page', lambda: transactions.get_transactions_page(user_id)),
+        ('service.search_transactions', lambda: transactions.search_transactions(user_id, 'uber')),
+        ('service.get_budget_analytics', lambda: budgets.get_budget_analytics(user_id)),
+        ('service.get_budget_warnings', lambda: budgets.get_budget_warnings(user_id)),
+        ('service.get_spending_breakdown_by_category',
+         lambda: budgets.get_spending_breakdown_by_category(user_id)),
+    ]
+
+
+def route_benchmarks(client, window_start: str) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, call) for every read route, through a logged-in test client."""
+    def get(url: str):
+        response = client.get(url)
+        body = response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return body
+
+    urls = [route.format(window_start=window_start) for route in ROUTES]
+    return [(f"route GET {url}", lambda url=url: get(url)) for url in urls]
+
+
+def run_suite(sizes: List[int], users: int = 1, budgets: int = 5, repeat: int = 5,
+              seed: int = 0, warm: bool = False, log: Callable[[str], None] = print) -> Dict:
+    """Generate the data for every size, time every benchmark and return the results document."""
+    from app.main import create_app
+    from app.services.cache import analytics_cache
+    from benchmarks.datagen import DatasetSpec, generate
+
+    app = create_app()
+    app.config['TESTING'] = True
+    clear = None if warm else analytics_cache.backend.clear
+
+    results = []
+    for size in sizes:
+        spec = DatasetSpec(users=users, transactions_per_user=size, budgets_per_user=budgets, seed=seed)
+        started = time.perf_counter()
+        target = generate(spec)[0]
+        log(f"size {size}: data ready in {time.perf_counter() - started:.1f}s")
+        window_start = (spec.end_date - timedelta(days=89)).isoformat()
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = target.user_id
+            session['username'] = target.username
+
+        benchmarks = service_benchmarks(target.user_id, window_start) + route_benchmarks(client, window_start)
+        for name, func in benchmarks:
+            timing = Timing.from_samples(name, size, time_call(func, repeat, clear))
+            results.append(timing)
+            log(f"  {name:<60} {timing.median_ms:>10.2f} ms")
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'users': users,
+            'budgets': budgets,
+            'repeat': repeat,
+            'seed': seed,
+            'warm': warm,
+        },
+        'results': [asdict(timing) for timing in results],
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Describe every benchmark whose median grew by more than ``tolerance``
+    (a fraction) relative to the baseline. Benchmarks missing from either
+    side are not compared.
+    """
+    previous = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results['results']:
+        before = previous.get((result['name'], result['size']))
+        if not before or before['median_ms'] <= 0:
+            continue
+        change = result['median_ms'] / before['median_ms'] - 1
+        if change > tolerance:
+            regressions.append(f"{result['name']} @ {result['size']}: "
+                               f"{before['median_ms']:.2f} -> {result['median_ms']:.2f} ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='1000,10000', help='Comma-separated transactions per user.')
+    parser.add_argument('--users', type=int, default=3, help='Users generated per size.')
+    parser.add_argument('--budgets', type=int, default=5, help='Budgets per user.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed calls per benchmark.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warm', action='store_true', help='Keep the analytics cache between calls.')
+    parser.add_argument('--database-dir', default=None, help='Directory for the benchmark database.')
+    parser.add_argument('--output', default=None, help='Write the results JSON here.')
+    parser.add_argument('--baseline', default=None, help='Compare with the results JSON of an earlier run.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed median slowdown against the baseline, as a fraction.')
+    args = parser.parse_args(argv)
+
+    # The configuration is read on first import of the app, so this comes first
+    os.environ['DATABASE_PATH'] = args.database_dir or tempfile.mkdtemp(prefix='finance-tracker-bench-')
+    os.environ.setdefault('DEBUG', 'False')
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = run_suite(sizes, args.users, args.budgets, args.repeat, args.seed, args.warm)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {len(results['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,7 @@ Configuration settings for the Finance Tracker application.
 """
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 
 @dataclass
@@ -11,6 +11,17 @@ class DatabaseConfig:
     """Database configuration settings."""
     name: str
     path: Optional[str] = None
+    pool_size: int = 5
+    pool_timeout: float = 30.0
+    pool_health_check_interval: float = 60.0
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 16384
+    mmap_size: int = 268435456
+    fetch_batch_size: int = 500
+    lookup_cache_size: int = 10000
+    instrument_queries: bool = True
+    slow_query_ms: float = 100.0
+    slow_query_log: Optional[str] = None
     
     @property
     def connection_string(self) -> str:
@@ -20,6 +31,15 @@ class DatabaseConfig:
         return self.name
 
 
+@dataclass
+class CacheConfig:
+    """Analytics cache settings."""
+    enabled: bool = True
+    max_entries: int = 1024
+    ttl_seconds: float = 300.0
+    max_bytes: int = 32 * 1024 * 1024
+
+
 @dataclass
 class AppConfig:
     """Application configuration settings."""
@@ -27,11 +47,25 @@ class AppConfig:
     debug: bool = False
     host: str = '127.0.0.1'
     port: int = 5000
+    debug_toolbar: bool = False
+    metrics_enabled: bool = False
+    metrics_token: Optional[str] = None
+    profiling_enabled: bool = False
+    profile_all_requests: bool = False
+    profiling_token: Optional[str] = None
+    admin_users: Tuple[str, ...] = ()
+    page_size: int = 50
+    max_page_size: int = 500
+    max_batch_size: int = 5000
+    import_chunk_size: int = 1000
     database: DatabaseConfig = None
+    cache: CacheConfig = None
     
     def __post_init__(self):
         if self.database is None:
             self.database = DatabaseConfig(name='finance_tracker.db')
+        if self.cache is None:
+            self.cache = CacheConfig()
 
 
 class Config:
@@ -45,9 +79,36 @@ class Config:
             debug=os.getenv('DEBUG', 'True').lower() == 'true',
             host=os.getenv('HOST', '127.0.0.1'),
             port=int(os.getenv('PORT', '5000')),
+            debug_toolbar=os.getenv('DEBUG_TOOLBAR', 'False').lower() == 'true',
+            metrics_enabled=os.getenv('METRICS_ENABLED', 'False').lower() == 'true',
+            metrics_token=os.getenv('METRICS_TOKEN'),
+            profiling_enabled=os.getenv('PROFILING', 'False').lower() == 'true',
+            profile_all_requests=os.getenv('PROFILE_ALL_REQUESTS', 'False').lower() == 'true',
+            profiling_token=os.getenv('PROFILING_TOKEN'),
+            admin_users=tuple(name.strip() for name in os.getenv('ADMIN_USERS', '').split(',') if name.strip()),
+            page_size=int(os.getenv('PAGE_SIZE', '50')),
+            max_page_size=int(os.getenv('MAX_PAGE_SIZE', '500')),
+            max_batch_size=int(os.getenv('MAX_BATCH_SIZE', '5000')),
+            import_chunk_size=int(os.getenv('IMPORT_CHUNK_SIZE', '1000')),
             database=DatabaseConfig(
                 name=os.getenv('DATABASE_NAME', 'finance_tracker.db'),
-                path=os.getenv('DATABASE_PATH')
+                path=os.getenv('DATABASE_PATH'),
+                pool_size=int(os.getenv('DATABASE_POOL_SIZE', '5')),
+                pool_timeout=float(os.getenv('DATABASE_POOL_TIMEOUT', '30')),
+                busy_timeout_ms=int(os.getenv('DATABASE_BUSY_TIMEOUT_MS', '5000')),
+                cache_size_kib=int(os.getenv('DATABASE_CACHE_SIZE_KIB', '16384')),
+                mmap_size=int(os.getenv('DATABASE_MMAP_SIZE', '268435456')),
+                fetch_batch_size=int(os.getenv('DATABASE_FETCH_BATCH_SIZE', '500')),
+                lookup_cache_size=int(os.getenv('DATABASE_LOOKUP_CACHE_SIZE', '10000')),
+                instrument_queries=os.getenv('DATABASE_INSTRUMENT_QUERIES', 'True').lower() == 'true',
+                slow_query_ms=float(os.getenv('DATABASE_SLOW_QUERY_MS', '100')),
+                slow_query_log=os.getenv('DATABASE_SLOW_QUERY_LOG')
+            ),
+            cache=CacheConfig(
+                enabled=os.getenv('CACHE_ENABLED', 'True').lower() == 'true',
+                max_entries=int(os.getenv('CACHE_MAX_ENTRIES', '1024')),
+                ttl_seconds=float(os.getenv('CACHE_TTL_SECONDS', '300')),
+                max_bytes=int(os.getenv('CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
             )
         )
 
@@ -1,6 +1,17 @@
 # tests/conftest.py
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
 import pytest
+
+# Point the app at a throwaway database before anything reads the config,
+# so test runs never touch the checked-in finance_tracker.db.
+os.environ.setdefault("DATABASE_PATH", tempfile.mkdtemp(prefix="finance-tracker-tests-"))
+
 from app.main import create_app
+from app.repositories.instrumentation import capture_queries
 
 
 @pytest.fixture
@@ -16,3 +27,31 @@ def client(app):
     #Simple test client for making HTTP requests.
     
     return app.test_client()
+
+
+@pytest.fixture
+def auth_client(client):
+    #Test client logged in as a freshly registered user.
+    username = f"user{uuid.uuid4().hex[:12]}"
+    client.post("/register", data={
+        "username": username,
+        "email": f"{username}@example.com",
+        "phone": "5550100",
+        "password": "secret",
+    })
+    client.post("/login", data={"username": username, "password": "secret"})
+    with client.session_transaction() as session:
+        client.user_id = session["user_id"]
+    return client
+
+
+@pytest.fixture
+def max_queries():
+    #Context manager failing the test if the block runs more than `limit` SQL statements.
+    @contextmanager
+    def check(limit):
+        with capture_queries() as log:
+            yield log
+        statements = "\n".join(query.sql for query in log.queries)
+        assert log.count <= limit, f"{log.count} queries (limit {limit}):\n{statements}"
+    return check
@@ -0,0 +1,61 @@
+# tests/test_analytics_cache.py
+import time
+
+from app.models import User
+from app.repositories.base import DatabaseInitializer
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.user_repository import UserRepository
+from app.services.cache import AnalyticsCache, LRUCache, MISSING
+from app.services.transaction_service import TransactionService
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_lru_expires_entries_after_ttl():
+    cache = LRUCache(ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+
+
+def test_lru_respects_memory_bound():
+    cache = LRUCache(max_bytes=2000)
+    for i in range(10):
+        cache.set(i, "x" * 500)
+    assert cache.stats()["bytes"] <= 2000
+    assert cache.get(9) is not MISSING
+
+
+def test_summary_is_cached_until_the_user_writes(auth_client):
+    service = TransactionService(cache=AnalyticsCache(LRUCache()))
+    user_id = auth_client.user_id
+    service.create_transaction(user_id, 10.0, "Food", "2024-01-01", "", "UPI", "expense")
+
+    first = service.get_financial_summary(user_id)
+    assert service.get_financial_summary(user_id) is first
+
+    service.create_transaction(user_id, 5.0, "Food", "2024-01-02", "", "UPI", "expense")
+    assert service.get_financial_summary(user_id).total_expense == 15.0
+
+
+def test_databases_do_not_share_cached_analytics(tmp_path):
+    cache = AnalyticsCache(LRUCache())
+    totals = []
+    for name, amount in (("a.db", 10.0), ("b.db", 99.0)):
+        db_path = str(tmp_path / name)
+        DatabaseInitializer(db_path).initialize_database()
+        user = UserRepository(db_path).create(User(username="same", email="same@example.com"))
+        service = TransactionService(TransactionRepository(db_path), cache)
+        service.create_transaction(user.id, amount, "Food", "2024-01-01", "", "UPI", "expense")
+        totals.append(service.get_financial_summary(user.id).total_expense)
+
+    assert totals == [10.0, 99.0]
@@ -0,0 +1,50 @@
+# tests/test_batch_ingestion.py
+from app.repositories.transaction_repository import TransactionRepository
+
+
+def test_batch_endpoint_inserts_valid_rows_and_reports_errors(auth_client):
+    rows = [
+        {"amount": 10, "category": "Food", "date": "2024-05-01", "payment_method": "UPI"},
+        {"amount": "abc", "category": "Food", "date": "2024-05-01", "payment_method": "UPI"},
+        {"amount": 20, "category": "Rent", "date": "05/01/2024", "payment_method": "Cash"},
+        {"amount": 30, "category": "Salary", "date": "2024-05-02", "payment_method": "Bank",
+         "transaction_type": "income", "notes": "May"},
+        {"amount": "nan", "category": "Food", "date": "2024-05-03", "payment_method": "UPI"},
+        {"amount": "inf", "category": "Food", "date": "2024-05-03", "payment_method": "UPI"},
+        {"amount": 1e20, "category": "Food", "date": "2024-05-03", "payment_method": "UPI"},
+    ]
+
+    response = auth_client.post("/api/transactions/batch", json={"transactions": rows})
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 2
+    assert [e["index"] for e in body["errors"]] == [1, 2, 4, 5, 6]
+
+    stored = {t.id: t for t in TransactionRepository().get_by_user_id(auth_client.user_id)}
+    assert set(stored) == set(body["ids"])
+    assert sorted(t.amount for t in stored.values()) == [10.0, 30.0]
+    assert stored[body["ids"][1]].description == "May"
+
+
+def test_batch_endpoint_rejects_non_list_payload(auth_client):
+    response = auth_client.post("/api/transactions/batch", json={"transactions": "nope"})
+    assert response.status_code == 400
+
+
+def test_failed_batch_insert_leaves_no_rows_behind(auth_client, monkeypatch):
+    write_params = TransactionRepository._write_params
+
+    def overflow_last_row(self, transactions):
+        params = write_params(self, transactions)
+        params[-1] = (params[-1][0], 2 ** 63) + params[-1][2:]
+        return params
+    monkeypatch.setattr(TransactionRepository, "_write_params", overflow_last_row)
+
+    rows = [{"amount": amount, "category": "Food", "date": "2024-05-01", "payment_method": "UPI"}
+            for amount in (10, 11, 12)]
+    response = auth_client.post("/api/transactions/batch", json={"transactions": rows})
+
+    assert response.status_code == 400
+    assert response.get_json()["created"] == 0
+    assert TransactionRepository().get_by_user_id(auth_client.user_id) == []
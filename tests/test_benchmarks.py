@@ -0,0 +1,38 @@
+# tests/test_benchmarks.py
+import random
+from datetime import date
+
+from benchmarks.datagen import DatasetSpec, build_transactions, generate
+from benchmarks.run import compare
+
+
+def test_generator_is_deterministic_and_realistic():
+    def build():
+        return build_transactions(random.Random("7:0"), 1, 400, date(2024, 12, 31), 366)
+
+    first, second = build(), build()
+
+    assert [(t.date, t.category, t.amount) for t in first] == [(t.date, t.category, t.amount) for t in second]
+    assert len(first) == 400
+    assert "2024-01-01" <= first[0].date <= first[-1].date <= "2024-12-31"
+    assert sum(t.category == "Salary" for t in first) == 12
+
+
+def test_generate_stores_users_once(auth_client):
+    spec = DatasetSpec(users=2, transactions_per_user=50, budgets_per_user=3, seed=99)
+
+    users = generate(spec, prefix="gen")
+
+    assert generate(spec, prefix="gen") == users
+    response = auth_client.get("/api/transactions?limit=500")  # another user's view is unaffected
+    assert response.get_json()["transactions"] == []
+
+
+def test_compare_reports_slowdowns_beyond_tolerance():
+    baseline = {"results": [{"name": "a", "size": 10, "median_ms": 10.0},
+                            {"name": "b", "size": 10, "median_ms": 10.0}]}
+    results = {"results": [{"name": "a", "size": 10, "median_ms": 12.0},
+                           {"name": "b", "size": 10, "median_ms": 14.0},
+                           {"name": "c", "size": 10, "median_ms": 99.0}]}
+
+    assert compare(results, baseline, tolerance=0.25) == ["b @ 10: 10.00 -> 14.00 ms (+40%)"]
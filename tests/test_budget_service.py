@@ -0,0 +1,45 @@
+# tests/test_budget_service.py
+from app.repositories.budget_repository import BudgetRepository
+from app.services.budget_service import BudgetService
+from app.services.transaction_service import TransactionService
+
+
+def test_budget_analytics_counts_only_matching_expenses_in_window(auth_client):
+    user_id = auth_client.user_id
+    transactions = TransactionService()
+    for amount, category, date, kind in [
+        (40.0, "Food", "2024-02-10", "expense"),
+        (15.0, "Food", "2024-02-28", "expense"),
+        (99.0, "Food", "2024-03-05", "expense"),   # after the window
+        (70.0, "Food", "2024-01-31", "expense"),   # before the window
+        (10.0, "Rent", "2024-02-15", "expense"),   # other category
+        (500.0, "Food", "2024-02-15", "income"),   # not an expense
+    ]:
+        transactions.create_transaction(user_id, amount, category, date, "", "UPI", kind)
+
+    service = BudgetService()
+    service.create_budget(user_id, "Food", 50.0, "monthly", "2024-02-01", "2024-02-29")
+    service.create_budget(user_id, "Travel", 20.0, "monthly", "2024-02-01")
+
+    analytics = {a.budget.category: a for a in service.get_budget_analytics(user_id)}
+
+    assert analytics["Food"].spent_amount == 55.0
+    assert analytics["Food"].is_overspent
+    assert analytics["Travel"].spent_amount == 0
+    assert [w["category"] for w in service.get_budget_warnings(user_id)] == ["Food"]
+
+
+def test_unpadded_budget_dates_are_stored_as_iso_and_tolerated(auth_client):
+    user_id = auth_client.user_id
+    TransactionService().create_transaction(user_id, 8.0, "Food", "2024-01-07", "", "UPI", "expense")
+
+    service = BudgetService()
+    success, _, budget = service.create_budget(user_id, "Food", 50.0, "monthly", "2024-1-5", "2024-1-31")
+    assert success and (budget.start_date, budget.end_date) == ("2024-01-05", "2024-01-31")
+
+    # A row written before dates were normalized leaves that side of its window open
+    with BudgetRepository().get_connection() as conn:
+        conn.execute("UPDATE budgets SET start_date = '2024-1-9' WHERE id = ?", (budget.id,))
+
+    assert auth_client.get("/budgets").status_code == 200
+    assert [a.spent_amount for a in service.get_budget_analytics(user_id)] == [8.0]
@@ -0,0 +1,68 @@
+# tests/test_categories.py
+from app.repositories.category_repository import CategoryRepository, _lookups
+from app.repositories.unit_of_work import current_unit_of_work
+from app.services.budget_service import BudgetService
+from app.services.transaction_service import TransactionService
+
+
+def test_rename_is_one_update_seen_by_transactions_and_budgets(auth_client):
+    user_id = auth_client.user_id
+    service = TransactionService()
+    service.create_transaction(user_id, 20.0, "Food", "2024-03-01", "", "UPI", "expense")
+    BudgetService().create_budget(user_id, "Food", 100.0, "monthly", "2024-03-01")
+
+    assert CategoryRepository().rename(user_id, "Food", "Groceries")
+
+    assert [t.category for t in service.get_user_transactions(user_id)] == ["Groceries"]
+    assert service.get_financial_summary(user_id).expense_by_category == {"Groceries": 20.0}
+    assert [a.budget.category for a in BudgetService().get_budget_analytics(user_id)] == ["Groceries"]
+    assert service.transaction_repository.get_by_category(user_id, "Food") == []
+
+
+def test_categories_are_per_user_and_payment_methods_shared(auth_client):
+    repository = CategoryRepository()
+    first = repository.resolve_ids(auth_client.user_id, ["Food", "Rent"])
+    other = repository.resolve_ids(auth_client.user_id + 1000, ["Food"])
+
+    assert first == repository.resolve_ids(auth_client.user_id, ["Rent", "Food"])
+    assert other["Food"] != first["Food"]
+    assert repository.resolve_payment_method_ids(["UPI"]) == repository.resolve_payment_method_ids(["UPI"])
+
+
+def test_rolled_back_category_is_not_cached(app, auth_client):
+    repository = CategoryRepository()
+    with app.test_request_context("/"):
+        created = repository.resolve_ids(auth_client.user_id, ["Travel"])["Travel"]
+        current_unit_of_work().rollback()
+        current_unit_of_work().close()
+
+    assert repository.get_id(auth_client.user_id, "Travel") is None
+    assert repository.resolve_ids(auth_client.user_id, ["Travel"])["Travel"] >= created
+
+
+def test_deleted_category_is_not_cached(auth_client):
+    user_id = auth_client.user_id
+    repository = CategoryRepository()
+    deleted = repository.resolve_ids(user_id, ["Gifts"])["Gifts"]
+    assert repository.delete(deleted)
+
+    assert repository.get_id(user_id, "Gifts") is None
+    service = TransactionService()
+    service.create_transaction(user_id, 15.0, "Gifts", "2024-03-01", "", "UPI", "expense")
+    assert [t.category for t in service.get_user_transactions(user_id)] == ["Gifts"]
+
+
+def test_lookups_cached_before_a_delete_commits_are_dropped_after(app, auth_client):
+    user_id = auth_client.user_id
+    repository = CategoryRepository()
+    gifts = repository.resolve_ids(user_id, ["Gifts"])["Gifts"]
+
+    with app.test_request_context("/"):
+        uow = current_unit_of_work()
+        assert repository.delete(gifts)
+        # A concurrent request still sees the committed row and caches it
+        _lookups.update({(repository.db_path, "category", user_id, "Gifts"): gifts})
+        uow.commit()
+        uow.close()
+
+    assert repository.get_id(user_id, "Gifts") is None
@@ -0,0 +1,26 @@
+# tests/test_conditional_get.py
+import pytest
+
+
+@pytest.mark.parametrize("url", ["/daily_spending_data", "/monthly_spending_data", "/budget_warnings"])
+def test_matching_etag_returns_304(auth_client, url):
+    first = auth_client.get(url)
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    second = auth_client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.data == b""
+
+
+def test_etag_changes_after_a_write(auth_client):
+    etag = auth_client.get("/daily_spending_data").headers["ETag"]
+    auth_client.post("/add_transaction", data={
+        "category": "Food", "payment_method": "UPI", "notes": "",
+        "transaction_type": "expense", "date": "2024-01-15", "amount": 3,
+    })
+
+    response = auth_client.get("/daily_spending_data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["amounts"] == [3.0]
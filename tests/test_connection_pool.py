@@ -0,0 +1,67 @@
+# tests/test_connection_pool.py
+import threading
+
+import pytest
+
+from app.repositories.pool import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2, timeout=0.1)
+    yield pool
+    pool.close()
+
+
+def test_connection_is_reused_by_the_same_thread(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert pool.stats()["opened"] == 1
+
+
+def test_nested_checkouts_share_one_connection(pool):
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+    assert pool.stats()["in_use"] == 0
+
+
+def test_pragmas_are_applied_on_open(pool):
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_checkout_times_out_when_pool_is_exhausted(pool):
+    held = threading.Event()
+    done = threading.Event()
+
+    def hold():
+        with pool.connection():
+            held.set()
+            done.wait()
+
+    workers = [threading.Thread(target=hold) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+        held.wait()
+        held.clear()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    done.set()
+    for worker in workers:
+        worker.join()
+
+
+def test_open_transaction_is_rolled_back_on_release(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
@@ -0,0 +1,80 @@
+# tests/test_csv_import.py
+import io
+
+from app.repositories.transaction_repository import TransactionRepository
+from app.services.import_service import ColumnMapping, ImportService
+
+STATEMENT = """Txn Date,Details,Amount
+01/03/2024,Coffee,-3.50
+01/03/2024,Coffee,-3.50
+02/03/2024,Salary,"2,500.00"
+bad date,Oops,-1
+03/03/2024,Zero,0
+04/03/2024,Broken,nan
+04/03/2024,Broken,-inf
+05/03/2024,Huge,-1e20
+"""
+
+MAPPING = ColumnMapping(date="Txn Date", amount="Amount", description="Details",
+                        category=None, payment_method=None, transaction_type=None,
+                        date_format="%d/%m/%Y", signed_amounts=True)
+
+
+def test_import_maps_columns_and_reports_bad_rows(auth_client):
+    result = ImportService().import_csv(auth_client.user_id, io.StringIO(STATEMENT), MAPPING, chunk_size=2)
+
+    assert (result.imported, result.duplicates, result.failed) == (3, 0, 5)
+    assert [e["line"] for e in result.errors] == [5, 6, 7, 8, 9]
+
+    stored = TransactionRepository().get_by_user_id(auth_client.user_id)
+    assert sorted((t.date, t.amount, t.transaction_type.value) for t in stored) == [
+        ("2024-03-01", 3.5, "expense"),
+        ("2024-03-01", 3.5, "expense"),
+        ("2024-03-02", 2500.0, "income"),
+    ]
+
+
+def test_reimporting_a_statement_skips_duplicates(auth_client):
+    service = ImportService()
+    service.import_csv(auth_client.user_id, io.StringIO(STATEMENT), MAPPING)
+
+    # Overlapping statement: one row already imported, one new
+    overlap = "Txn Date,Details,Amount\n02/03/2024,Salary,2500\n04/03/2024,Taxi,-12\n"
+    result = service.import_csv(auth_client.user_id, io.StringIO(overlap), MAPPING)
+
+    assert (result.imported, result.duplicates) == (1, 1)
+    assert len(TransactionRepository().get_by_user_id(auth_client.user_id)) == 4
+
+
+def test_upload_endpoint_imports_file(auth_client):
+    csv_data = b"date,amount,category,payment_method\n2024-04-01,9.99,Food,UPI\n"
+    response = auth_client.post("/import_transactions", data={
+        "file": (io.BytesIO(csv_data), "statement.csv"),
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 302
+    assert [t.amount for t in TransactionRepository().get_by_user_id(auth_client.user_id)] == [9.99]
+
+
+def test_upload_endpoint_rejects_mistyped_mapping(auth_client):
+    csv_data = b"date,amount\n01/04/2024,9.99\n"
+    response = auth_client.post("/import_transactions", data={
+        "file": (io.BytesIO(csv_data), "statement.csv"),
+        "mapping": '{"date_format": 5}',
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert TransactionRepository().get_by_user_id(auth_client.user_id) == []
+
+
+def test_undecodable_or_malformed_file_is_reported_not_raised(auth_client):
+    latin1 = "date,amount,category,payment_method\n2024-04-01,9.99,Caf\xe9,UPI\n".encode("latin-1")
+    response = auth_client.post("/import_transactions", data={
+        "file": (io.BytesIO(latin1), "statement.csv"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 302
+
+    oversized = "date,amount\n2024-04-01,9.99\n2024-04-02," + "9" * 200_000 + "\n"
+    result = ImportService().import_csv(auth_client.user_id, io.StringIO(oversized))
+    assert result.imported == 1
+    assert result.errors[0]["line"] == 3 and "not valid CSV" in result.errors[0]["message"]
@@ -0,0 +1,38 @@
+# tests/test_export.py
+import csv
+import io
+import json
+
+from app.services.transaction_service import TransactionService
+
+
+def _seed(user_id):
+    service = TransactionService()
+    for amount, category, date in [(10.0, "Food", "2024-01-05"), (20.0, "Rent", "2024-02-01"),
+                                   (5.0, "Food", "2024-03-10")]:
+        service.create_transaction(user_id, amount, category, date, "note, with comma", "UPI", "expense")
+
+
+def test_csv_export_streams_filtered_rows(auth_client):
+    _seed(auth_client.user_id)
+
+    response = auth_client.get("/export_transactions?format=csv&category=Food&start=2024-01-01&end=2024-02-28")
+
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(r["date"], r["amount"], r["description"]) for r in rows] == [
+        ("2024-01-05", "10.0", "note, with comma")]
+
+
+def test_ndjson_export_returns_one_object_per_line(auth_client):
+    _seed(auth_client.user_id)
+
+    response = auth_client.get("/export_transactions?format=ndjson")
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["date"] for line in lines] == ["2024-03-10", "2024-02-01", "2024-01-05"]
+
+
+def test_unknown_export_format_is_rejected(auth_client):
+    assert auth_client.get("/export_transactions?format=xml").status_code == 400
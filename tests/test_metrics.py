@@ -0,0 +1,85 @@
+# tests/test_metrics.py
+import threading
+import time
+
+from config.settings import config
+from app.metrics import MetricsRegistry, metrics
+from app.repositories.transaction_repository import TransactionRepository
+from app.services.transaction_service import TransactionService
+
+
+def test_histograms_and_counters_render_in_prometheus_format():
+    registry = MetricsRegistry(stripes=2)
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    errors = registry.counter("demo_errors_total", "Demo errors.", ("route",))
+    registry.callback("demo_up", "gauge", "Demo gauge.", lambda: [((("pool", 'a"b'),), 1)])
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        registry.observe(latency, value, "index")
+    registry.inc(errors, "index", amount=2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{route="index",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{route="index",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{route="index",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{route="index"} 3.65' in lines
+    assert 'demo_errors_total{route="index"} 2' in lines
+    assert 'demo_up{pool="a\\"b"} 1' in lines
+
+
+def test_threads_record_into_different_stripes():
+    registry = MetricsRegistry(stripes=4)
+    hits = registry.counter("demo_total", "Demo counter.")
+    threads = [threading.Thread(target=registry.inc, args=(hits,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert all(stripe.counters for stripe in registry._stripes)
+    assert "demo_total 4" in registry.render().splitlines()
+
+
+def test_metrics_endpoint_reports_routes_repositories_caches_and_pools(auth_client, monkeypatch):
+    monkeypatch.setattr(config, "metrics_enabled", True)
+    auth_client.get("/transactions")
+    auth_client.get("/budgets")
+
+    response = auth_client.get("/metrics")
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert 'finance_request_duration_seconds_count{endpoint="transactions.transactions",method="GET",status="200"}' in body
+    assert 'finance_repository_call_duration_seconds_count{repository="TransactionRepository",method="query"}' in body
+    assert 'finance_cache_hit_ratio{cache="analytics"}' in body
+    assert 'finance_pool_connections{database=' in body
+
+
+def test_lazy_repository_methods_are_timed_until_exhausted(auth_client):
+    TransactionService().create_transaction(auth_client.user_id, 5.0, "Food", "2024-01-01", "", "UPI", "expense")
+    series = 'finance_repository_call_duration_seconds_sum{repository="TransactionRepository",method="iter_by_user_id"}'
+
+    def recorded():
+        for line in metrics.render().splitlines():
+            if line.startswith(series + " "):
+                return float(line.split()[-1])
+        return 0.0
+
+    before = recorded()
+    for _ in TransactionRepository().iter_by_user_id(auth_client.user_id):
+        time.sleep(0.05)
+
+    assert recorded() - before >= 0.05
+
+
+def test_metrics_endpoint_is_off_by_default_and_guarded(client, monkeypatch):
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(config, "metrics_enabled", True)
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "10.0.0.8"}).status_code == 404
+
+    monkeypatch.setattr(config, "metrics_token", "s3cret")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"},
+                      environ_base={"REMOTE_ADDR": "10.0.0.8"}).status_code == 200
@@ -0,0 +1,108 @@
+# tests/test_migrations.py
+import sqlite3
+
+from app.models import to_cents
+from app.repositories.migrations import MigrationRunner
+
+
+def _indexes(conn):
+    return {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transactions'"
+    )}
+
+
+def test_fresh_database_is_migrated_to_latest(tmp_path):
+    conn = sqlite3.connect(tmp_path / "fresh.db")
+    runner = MigrationRunner(conn)
+
+    assert runner.run() == [m.version for m in runner.migrations]
+    assert runner.current_version() == runner.latest_version
+    assert {"ix_transactions_user_date",
+            "ix_transactions_user_type_category",
+            "ix_transactions_user_category_date"} <= _indexes(conn)
+
+
+def test_up_to_date_database_skips_all_ddl(tmp_path):
+    conn = sqlite3.connect(tmp_path / "current.db")
+    MigrationRunner(conn).run()
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    assert MigrationRunner(conn).run() == []
+    assert statements == ["SELECT MAX(version) FROM schema_version"]
+
+
+def test_legacy_schema_is_upgraded(tmp_path):
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    conn.executescript("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL,
+            description TEXT,
+            payment_method TEXT NOT NULL
+        );
+        CREATE INDEX ix_tx_user_date ON transactions(user_id, date);
+        CREATE INDEX ix_tx_user_cat ON transactions(user_id, category);
+        INSERT INTO transactions (user_id, amount, category, date, payment_method)
+        VALUES (1, 10.0, 'Food', '2024-01-01', 'Cash');
+    """)
+
+    MigrationRunner(conn).run()
+
+    row = conn.execute("SELECT transaction_type, created_at FROM transactions").fetchone()
+    assert row[0] == "expense" and row[1] is not None
+    assert not {"ix_tx_user_date", "ix_tx_user_cat"} & _indexes(conn)
+
+
+def test_money_is_converted_to_integer_cents(tmp_path):
+    conn = sqlite3.connect(tmp_path / "cents.db")
+    runner = MigrationRunner(conn)
+    runner.migrations = [m for m in runner.migrations if m.version < 7]
+    runner.run()
+    conn.executescript("""
+        INSERT INTO transactions (user_id, amount, category, date, payment_method)
+        VALUES (1, 0.1, 'Food', '2024-01-01', 'Cash'), (1, 0.2, 'Food', '2024-01-02', 'Cash'),
+               (1, 1.005, 'Rent', '2024-01-03', 'Cash');
+        INSERT INTO budgets (user_id, category, allocated_amount, start_date)
+        VALUES (1, 'Food', 19.99, '2024-01-01');
+    """)
+    conn.commit()
+
+    MigrationRunner(conn).run()
+
+    assert "amount" not in {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}
+    assert conn.execute("SELECT allocated_cents FROM budgets").fetchone() == (1999,)
+    assert conn.execute(
+        "SELECT SUM(total_cents), typeof(SUM(total_cents)) FROM transaction_monthly_rollups"
+    ).fetchone() == (131, "integer")
+    # Halves round up as they do for new writes, despite 1.005 being stored as 1.00499...
+    assert conn.execute("SELECT amount_cents FROM transactions WHERE id = 3").fetchone() == (to_cents(1.005),) == (101,)
+
+
+def test_categories_and_payment_methods_become_ids(tmp_path):
+    conn = sqlite3.connect(tmp_path / "ids.db")
+    runner = MigrationRunner(conn)
+    runner.migrations = [m for m in runner.migrations if m.version < 8]
+    runner.run()
+    conn.executescript("""
+        INSERT INTO transactions (user_id, amount_cents, category, date, payment_method)
+        VALUES (1, 500, 'Food', '2024-01-01', 'Cash'), (2, 700, 'Food', '2024-01-02', 'Cash');
+        INSERT INTO budgets (user_id, category, allocated_cents, start_date)
+        VALUES (1, 'Food', 1000, '2024-01-01');
+    """)
+    conn.commit()
+
+    MigrationRunner(conn).run()
+
+    rows = conn.execute("""
+        SELECT t.user_id, c.name, p.name FROM transactions t
+        JOIN categories c ON c.id = t.category_id AND c.user_id = t.user_id
+        JOIN payment_methods p ON p.id = t.payment_method_id ORDER BY t.user_id
+    """).fetchall()
+    assert rows == [(1, "Food", "Cash"), (2, "Food", "Cash")]
+    assert conn.execute("""
+        SELECT c.name FROM budgets b JOIN categories c ON c.id = b.category_id
+    """).fetchall() == [("Food",)]
@@ -0,0 +1,60 @@
+# tests/test_profiling.py
+import pytest
+
+from config.settings import config
+from app.profiling import profile_store
+
+
+@pytest.fixture
+def admin_client(auth_client, monkeypatch):
+    with auth_client.session_transaction() as session:
+        username = session["username"]
+    monkeypatch.setattr(config, "admin_users", (username,))
+    monkeypatch.setattr(config, "profiling_enabled", True)
+    profile_store.clear()
+    return auth_client
+
+
+def test_admin_header_profiles_request_and_admin_page_shows_it(admin_client):
+    admin_client.post("/add_transaction", data={
+        "date": "2024-03-01", "transaction_type": "expense", "category": "Food",
+        "amount": "12.50", "payment_method": "Cash", "notes": "lunch",
+    })
+    admin_client.get("/transactions", headers={"X-Profile": "1"})
+    admin_client.get("/budgets")
+
+    [(endpoint, profiles)] = profile_store.by_endpoint()
+    assert endpoint == "transactions.transactions"
+    profile = profiles[0]
+    assert profile.peak_bytes > 0
+    assert profile.retained_allocations
+    assert "cumulative" in profile.call_profile
+
+    listing = admin_client.get("/admin/profiles").get_data(as_text=True)
+    assert "transactions.transactions" in listing
+    detail = admin_client.get(f"/admin/profiles/{profile.id}")
+    assert detail.status_code == 200
+    assert "Memory Still Held at the End" in detail.get_data(as_text=True)
+
+
+def test_header_from_non_admin_is_ignored_and_admin_pages_are_hidden(auth_client):
+    profile_store.clear()
+    auth_client.get("/transactions", headers={"X-Profile": "1"})
+
+    assert profile_store.by_endpoint() == []
+    assert auth_client.get("/admin/profiles").status_code == 404
+
+
+def test_profiling_is_off_unless_enabled(admin_client, monkeypatch):
+    monkeypatch.setattr(config, "profiling_enabled", False)
+    admin_client.get("/transactions", headers={"X-Profile": "1"})
+
+    assert profile_store.by_endpoint() == []
+    assert admin_client.get("/admin/profiles").status_code == 404
+
+
+def test_profiling_token_is_required_when_set(admin_client, monkeypatch):
+    monkeypatch.setattr(config, "profiling_token", "s3cret")
+
+    assert admin_client.get("/admin/profiles").status_code == 404
+    assert admin_client.get("/admin/profiles", headers={"Authorization": "Bearer s3cret"}).status_code == 200
@@ -0,0 +1,47 @@
+# tests/test_query_instrumentation.py
+import logging
+
+from config.settings import config
+from app.repositories.instrumentation import normalize_sql
+from app.services.budget_service import BudgetService
+from app.services.transaction_service import TransactionService
+
+
+def test_normalize_sql_strips_literals_and_in_lists():
+    assert normalize_sql("SELECT * FROM t\n  WHERE id IN (?, ?, ?) AND name = 'x' AND n > 10") == \
+        "SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?"
+
+
+def test_responses_report_sql_in_server_timing(auth_client, monkeypatch):
+    response = auth_client.get("/budgets")
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and " queries\", app;dur=" in timing
+    assert 'id="sql-toolbar"' not in response.get_data(as_text=True)
+
+    monkeypatch.setattr(config, "debug_toolbar", True)
+    assert 'id="sql-toolbar"' in auth_client.get("/budgets").get_data(as_text=True)
+
+
+def test_budgets_page_query_count_does_not_grow_with_budgets(auth_client, max_queries):
+    user_id = auth_client.user_id
+    TransactionService().create_transaction(user_id, 10.0, "Food", "2024-01-05", "", "UPI", "expense")
+    budgets = BudgetService()
+    budgets.create_budget(user_id, "Food", 100.0, "monthly", "2024-01-01")
+    with max_queries(20) as few:
+        auth_client.get("/budgets")
+
+    for category in ("Rent", "Travel", "Fuel", "Health", "Shopping"):
+        budgets.create_budget(user_id, category, 100.0, "monthly", "2024-01-01")
+    with max_queries(few.count):
+        auth_client.get("/budgets")
+
+
+def test_slow_statements_are_logged(auth_client, caplog, monkeypatch):
+    from config.settings import config
+    monkeypatch.setattr(config.database, "slow_query_ms", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="finance_tracker.slow_queries"):
+        auth_client.get("/api/transactions")
+
+    assert any("slow query" in message for message in caplog.messages)
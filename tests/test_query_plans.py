@@ -0,0 +1,77 @@
+# tests/test_query_plans.py
+import re
+
+from app.models import TransactionFilter, TransactionSort, TransactionType
+from app.services.budget_service import BudgetService
+from app.services.transaction_service import TransactionService
+from app.repositories.instrumentation import capture_queries
+from app.repositories.pool import get_pool
+from app.repositories.query_plans import check_statements, plan_problems
+from app.repositories.user_repository import UserRepository
+from benchmarks.datagen import DatasetSpec, generate
+from benchmarks.run import route_benchmarks, service_benchmarks
+from config.settings import config
+
+# Statements allowed to sort, with the reason
+ALLOWED = [
+    re.compile(r"ORDER BY bm25\(transactions_fts\)"),  # relevance order only exists after matching
+]
+
+
+def _exercise(client, user):
+    # Every read service and route, plus the writes and lookups around them
+    for _, call in service_benchmarks(user.user_id, "2024-10-01") + route_benchmarks(client, "2024-10-01"):
+        call()
+    service = TransactionService()
+    # Each filter in the date orders its index serves, and the amount orders
+    # on their own; a filter on one key sorted by another is left to sort
+    date_filters = (TransactionFilter(),
+                    TransactionFilter(categories=["Food"]),
+                    TransactionFilter(payment_methods=["UPI"], start_date="2024-06-01"),
+                    TransactionFilter(transaction_type=TransactionType.INCOME),
+                    TransactionFilter(start_date="2024-01-01", end_date="2024-03-31"))
+    amount_filters = (TransactionFilter(), TransactionFilter(min_amount=10, max_amount=50))
+    for sorts, filter_set in (((TransactionSort.DATE_DESC, TransactionSort.DATE_ASC), date_filters),
+                              ((TransactionSort.AMOUNT_DESC, TransactionSort.AMOUNT_ASC), amount_filters)):
+        for sort in sorts:
+            for filters in filter_set:
+                filters.sort = sort
+                page = service.get_transactions_page(user.user_id, None, 20, filters)
+                service.get_transactions_page(user.user_id, page.next_page_token, 20, filters)
+
+    created = service.create_transaction(user.user_id, 9.0, "Food", "2024-12-01", "plan check", "UPI", "expense")[2]
+    created.amount = 10.0
+    service.update_transaction(created, user.user_id)
+    service.delete_transaction(created.id, user.user_id)
+
+    budgets = BudgetService()
+    budget = budgets.create_budget(user.user_id, "Pets", 50.0, "monthly", "2024-12-01")[2]
+    budgets.update_budget_allocation(budget.id, 60.0, user.user_id)
+    budgets.delete_budget(budget.id, user.user_id)
+
+    users = UserRepository()
+    users.get_by_username(user.username)
+    users.authenticate(user.username, "secret")
+    client.get("/logout")
+    client.post("/login", data={"username": user.username, "password": "secret"})
+
+
+def test_hot_repository_queries_use_indexes(client):
+    user = generate(DatasetSpec(users=2, transactions_per_user=2000, budgets_per_user=5, seed=23), prefix="plans")[0]
+    with client.session_transaction() as session:
+        session["user_id"], session["username"] = user.user_id, user.username
+
+    with capture_queries(keep_statements=True) as log:
+        _exercise(client, user)
+
+    with get_pool(config.database.connection_string).connection() as conn:
+        problems = check_statements(conn, log.statements, ALLOWED)
+    assert not problems, "\n\n".join(str(problem) for problem in problems)
+
+
+def test_plan_problems_flags_scans_and_sorts():
+    sql = "SELECT * FROM transactions t JOIN budgets b ON b.user_id = t.user_id ORDER BY t.amount_cents"
+    plan = ["SCAN t", "SEARCH b USING INDEX ix_budgets_user_created (user_id=?)", "USE TEMP B-TREE FOR ORDER BY"]
+
+    assert plan_problems(sql, plan) == ["SCAN t", "USE TEMP B-TREE FOR ORDER BY"]
+    assert plan_problems("SELECT * FROM transactions_fts", ["SCAN transactions_fts VIRTUAL TABLE INDEX 0:M1"]) == []
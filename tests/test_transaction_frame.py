@@ -0,0 +1,45 @@
+# tests/test_transaction_frame.py
+from app.models import TransactionType
+from app.models.frame import TransactionFrame
+
+
+CATEGORIES = {3: "Food", 7: "Rent", 9: "Salary"}
+METHODS = {1: "UPI", 2: "Bank", 5: "Cash"}
+
+
+def _frame():
+    return TransactionFrame.from_encoded(
+        days=["2024-01-05", "2024-01-05", "2024-02-01", "2024-02-10", "not-a-date"],
+        category_ids=[3, 7, 3, 9, 3], category_names=CATEGORIES,
+        method_ids=[1, 2, 5, 2, 1], method_names=METHODS,
+        types=["expense", "expense", "expense", "income", "expense"],
+        cents=[1500, 50000, 700, 100000, 300],
+        counts=[2, 1, 1, 1, 1],
+    )
+
+
+def test_group_totals_by_dictionary_code():
+    frame = _frame()
+    expense = frame.mask(transaction_type=TransactionType.EXPENSE)
+
+    assert frame.total(expense) == 525.0
+    assert frame.totals_by_category(expense) == {"Food": 25.0, "Rent": 500.0}
+    assert frame.totals_by_method(expense) == {"UPI": 18.0, "Bank": 500.0, "Cash": 7.0}
+
+
+def test_window_totals_match_budget_rules():
+    frame = _frame()
+    windows = [("Food", "2024-01-01", "2024-01-31"), ("Food", "2024-01-01", None),
+               ("Travel", "2024-01-01", "")]
+
+    assert frame.window_totals(windows) == [15.0, 22.0, 0.0]
+    # Bounds that are not ISO dates leave that side of the window open
+    assert frame.window_totals([("Food", "2024-1-5", "2024-01-31")]) == [15.0]
+
+
+def test_empty_frame():
+    frame = TransactionFrame.from_encoded([], [], CATEGORIES, [], METHODS, [], [], [])
+
+    assert len(frame) == 0
+    assert frame.totals_by_category() == {}
+    assert frame.window_totals([("Food", "2024-01-01", None)]) == [0.0]
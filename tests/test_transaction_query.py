@@ -0,0 +1,82 @@
+# tests/test_transaction_query.py
+from app.models import TransactionFilter, TransactionSort, TransactionType
+from app.services.transaction_service import TransactionService
+
+
+def _seed(auth_client):
+    service = TransactionService()
+    rows = [
+        (12.0, "Food", "2024-01-03", "UPI", "expense"),
+        (40.0, "Food", "2024-01-10", "Cash", "expense"),
+        (900.0, "Rent", "2024-01-01", "Bank", "expense"),
+        (2500.0, "Salary", "2024-01-31", "Bank", "income"),
+        (7.5, "Travel", "2024-02-02", "UPI", "expense"),
+    ]
+    for amount, category, date, method, kind in rows:
+        service.create_transaction(auth_client.user_id, amount, category, date, "", method, kind)
+    return service
+
+
+def test_api_combines_filters(auth_client):
+    _seed(auth_client)
+
+    response = auth_client.get(
+        "/api/transactions?category=Food&category=Travel&payment_method=UPI"
+        "&type=expense&start=2024-01-01&end=2024-02-28&min_amount=5&sort=amount_asc"
+    )
+
+    assert response.status_code == 200
+    assert [t["amount"] for t in response.get_json()["transactions"]] == [7.5, 12.0]
+
+
+def test_unknown_category_matches_nothing(auth_client):
+    _seed(auth_client)
+    response = auth_client.get("/api/transactions?category=Nope")
+    assert response.get_json()["transactions"] == []
+
+
+def test_invalid_filter_is_rejected(auth_client):
+    assert auth_client.get("/api/transactions?min_amount=abc").status_code == 400
+    assert auth_client.get("/api/transactions?min_amount=1e30").status_code == 400
+    assert auth_client.get("/api/transactions?max_amount=1e20").status_code == 400
+    assert auth_client.get("/transactions?max_amount=1e20").status_code == 302
+    assert auth_client.get("/api/transactions?sort=sideways").status_code == 400
+
+
+def test_amount_sorted_pages_cover_every_row_once(auth_client):
+    service = _seed(auth_client)
+    filters = TransactionFilter(sort=TransactionSort.AMOUNT_DESC)
+
+    seen, token = [], None
+    while True:
+        page = service.get_transactions_page(auth_client.user_id, token, 2, filters)
+        seen.extend(t.amount for t in page.transactions)
+        if not page.has_more:
+            break
+        token = page.next_page_token
+
+    assert seen == [2500.0, 900.0, 40.0, 12.0, 7.5]
+
+
+def test_filtered_queries_use_composite_indexes(auth_client):
+    repository = _seed(auth_client).transaction_repository
+    filters = [
+        TransactionFilter(categories=["Food"]),
+        TransactionFilter(payment_methods=["UPI"]),
+        TransactionFilter(transaction_type=TransactionType.INCOME),
+        TransactionFilter(min_amount=100, sort=TransactionSort.AMOUNT_DESC),
+    ]
+    with repository.get_connection() as conn:
+        for query_filter in filters:
+            sql, params = repository._query_sql(auth_client.user_id, query_filter)
+            plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            assert "SEARCH t USING INDEX ix_transactions_user_" in plan, plan
+
+
+def test_transactions_page_is_filtered(auth_client):
+    _seed(auth_client)
+    response = auth_client.get("/transactions?category=Food&sort=date_asc")
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert "900.0" not in body and "40.0" in body
@@ -0,0 +1,60 @@
+# tests/test_transaction_search.py
+from app.models import TransactionFilter, TransactionType
+from app.services.transaction_service import TransactionService
+
+
+def _seed(auth_client):
+    service = TransactionService()
+    rows = [
+        (12.0, "Travel", "2024-01-03", "Uber to the airport"),
+        (8.0, "Travel", "2024-01-05", "Uber Eats? no, uber ride home"),
+        (40.0, "Food", "2024-01-10", "Groceries at the café"),
+        (5.0, "Food", "2024-01-11", None),
+    ]
+    for amount, category, date, notes in rows:
+        service.create_transaction(auth_client.user_id, amount, category, date, notes, "UPI", "expense")
+    return service
+
+
+def test_search_ranks_prefix_matches_and_highlights(auth_client):
+    service = _seed(auth_client)
+
+    hits = service.search_transactions(auth_client.user_id, "ube")
+
+    assert [hit.transaction.amount for hit in hits] == [8.0, 12.0]
+    assert "\x02Uber\x03" in hits[1].snippet
+    assert service.search_transactions(auth_client.user_id, "cafe")[0].transaction.amount == 40.0
+    # FTS5 syntax in user input is taken literally
+    assert service.search_transactions(auth_client.user_id, 'uber" OR "*') == []
+
+
+def test_search_index_follows_updates_and_deletes(auth_client):
+    service = _seed(auth_client)
+    user_id = auth_client.user_id
+    hit = service.search_transactions(user_id, "groceries")[0]
+
+    hit.transaction.description = "Weekly market"
+    service.update_transaction(hit.transaction, user_id)
+    assert service.search_transactions(user_id, "groceries") == []
+    assert service.search_transactions(user_id, "market")[0].transaction.id == hit.transaction.id
+
+    service.delete_transaction(hit.transaction.id, user_id)
+    assert service.search_transactions(user_id, "market") == []
+
+
+def test_search_applies_filters_and_is_per_user(auth_client):
+    service = _seed(auth_client)
+
+    filters = TransactionFilter(start_date="2024-01-04", transaction_type=TransactionType.EXPENSE)
+    assert [hit.transaction.amount for hit in service.search_transactions(auth_client.user_id, "uber", filters)] == [8.0]
+    assert service.search_transactions(auth_client.user_id + 1, "uber") == []
+
+
+def test_search_page_escapes_notes(auth_client):
+    service = _seed(auth_client)
+    service.create_transaction(auth_client.user_id, 1.0, "Food", "2024-01-12", "<b>uber</b>", "UPI", "expense")
+
+    html = auth_client.get("/transactions?q=uber").get_data(as_text=True)
+
+    assert "&lt;b&gt;<mark>uber</mark>&lt;/b&gt;" in html
+    assert "Groceries" not in html
@@ -0,0 +1,152 @@
+# tests/test_transaction_service.py
+import pytest
+
+from app.models import Granularity, MAX_CENTS, to_cents
+from app.services.transaction_service import TransactionService
+
+
+def _seed(service, user_id):
+    rows = [
+        (100.0, "Salary", "Bank", "income"),
+        (20.0, "Food", "UPI", "expense"),
+        (5.5, "Food", "Cash", "expense"),
+        (30.0, "Rent", "UPI", "expense"),
+    ]
+    for amount, category, method, kind in rows:
+        service.create_transaction(user_id, amount, category, "2024-03-01", "", method, kind)
+
+
+def test_financial_summary_totals(auth_client):
+    service = TransactionService()
+    _seed(service, auth_client.user_id)
+
+    summary = service.get_financial_summary(auth_client.user_id)
+
+    assert summary.total_income == 100.0
+    assert summary.total_expense == 55.5
+    assert summary.net_balance == 44.5
+    assert summary.income_by_category == {"Salary": 100.0}
+    assert summary.expense_by_category == {"Food": 25.5, "Rent": 30.0}
+    assert summary.expense_by_payment_method == {"UPI": 50.0, "Cash": 5.5}
+
+
+def test_financial_summary_is_empty_for_new_user(auth_client):
+    summary = TransactionService().get_financial_summary(auth_client.user_id)
+    assert summary.total_income == summary.total_expense == 0
+    assert summary.expense_by_category == {}
+
+
+def test_chart_series_follow_writes(auth_client):
+    service = TransactionService()
+    user_id = auth_client.user_id
+    for amount, date in [(10.0, "2024-01-05"), (5.0, "2024-01-05"), (7.0, "2024-02-01")]:
+        service.create_transaction(user_id, amount, "Food", date, "", "UPI", "expense")
+
+    assert service.get_daily_spending_data(user_id) == {
+        "labels": ["2024-01-05", "2024-02-01"], "amounts": [15.0, 7.0]}
+
+    ten = next(t for t in service.get_user_transactions(user_id) if t.amount == 10.0)
+    service.delete_transaction(ten.id, user_id)
+    assert service.get_monthly_spending_data(user_id) == {
+        "labels": ["Jan 2024", "Feb 2024"], "amounts": [5.0, 7.0]}
+
+
+def test_rebuild_rollups_matches_trigger_maintained_rollups(auth_client):
+    service = TransactionService()
+    user_id = auth_client.user_id
+    _seed(service, user_id)
+    before = service.get_financial_summary(user_id)
+
+    service.transaction_repository.rebuild_rollups(user_id)
+
+    assert service.get_financial_summary(user_id) == before
+
+
+def test_keyset_pages_cover_every_transaction_once(auth_client):
+    service = TransactionService()
+    user_id = auth_client.user_id
+    for day in range(1, 8):
+        # Two rows per date so pages have to break ties on id
+        for _ in range(2):
+            service.create_transaction(user_id, day, "Food", f"2024-01-0{day}", "", "UPI", "expense")
+
+    seen, token = [], None
+    while True:
+        page = service.get_transactions_page(user_id, token, page_size=3)
+        seen.extend(page.transactions)
+        if not page.has_more:
+            break
+        token = page.next_page_token
+
+    assert len(seen) == 14 == len({t.id for t in seen})
+    assert [(t.date, t.id) for t in seen] == sorted(((t.date, t.id) for t in seen), reverse=True)
+
+
+def test_invalid_page_token_is_rejected(auth_client):
+    response = auth_client.get("/api/transactions?page=not-a-token")
+    assert response.status_code == 400
+
+
+def test_iterator_streams_in_batches(auth_client):
+    service = TransactionService()
+    user_id = auth_client.user_id
+    _seed(service, user_id)
+
+    rows = service.transaction_repository.iter_by_user_id(user_id, batch_size=1)
+    assert next(rows).user_id == user_id
+    assert len(list(rows)) == 3
+
+
+def test_loaded_transactions_are_slotted_and_complete(auth_client):
+    service = TransactionService()
+    service.create_transaction(auth_client.user_id, 12.5, "Food", "2024-03-02", "Lunch", "UPI", "expense")
+
+    loaded = service.get_user_transactions(auth_client.user_id)[0]
+    streamed = next(service.iter_user_transactions(auth_client.user_id))
+
+    assert not hasattr(loaded, "__dict__")
+    assert loaded == streamed
+    assert (loaded.amount, loaded.category, loaded.description) == (12.5, "Food", "Lunch")
+    assert loaded.is_expense
+    assert loaded.created_at is not None
+
+
+def test_totals_are_exact_in_cents(auth_client):
+    service = TransactionService()
+    for amount in (0.1, 0.2):
+        service.create_transaction(auth_client.user_id, amount, "Food", "2024-03-02", "", "UPI", "expense")
+
+    assert service.get_financial_summary(auth_client.user_id).total_expense == 0.3
+    assert service.get_user_transactions(auth_client.user_id)[0].amount in (0.1, 0.2)
+
+
+def test_amounts_beyond_int64_cents_are_rejected(auth_client):
+    assert to_cents(1e16) == 10 ** 18 < MAX_CENTS
+    for amount in (1e17, 1e30):
+        with pytest.raises(ValueError):
+            to_cents(amount)
+
+    success, message, _ = TransactionService().create_transaction(
+        auth_client.user_id, 1e20, "Food", "2024-03-02", "", "UPI", "expense")
+    assert not success and message == "Amount is too large"
+
+
+def test_spending_series_windows_and_granularities(auth_client):
+    service = TransactionService()
+    user_id = auth_client.user_id
+    for amount, date in [(10.0, "2023-12-31"), (5.0, "2024-01-01"), (7.0, "2024-02-15"), (3.0, "2024-04-01")]:
+        service.create_transaction(user_id, amount, "Food", date, "", "UPI", "expense")
+
+    assert service.get_spending_series(user_id, Granularity.WEEK, "2023-12-31", "2024-01-07") == {
+        "labels": ["2023-12-25", "2024-01-01"], "amounts": [10.0, 5.0]}
+    assert service.get_spending_series(user_id, Granularity.QUARTER, "2024-01-01") == {
+        "labels": ["Q1 2024", "Q2 2024"], "amounts": [12.0, 3.0]}
+    # Whole-month windows read the monthly rollup, partial ones the daily rollup
+    assert service.get_spending_series(user_id, Granularity.MONTH, "2024-01-01", "2024-02-29") == {
+        "labels": ["Jan 2024", "Feb 2024"], "amounts": [5.0, 7.0]}
+    assert service.get_spending_series(user_id, Granularity.YEAR, "2023-12-31", "2024-02-14") == {
+        "labels": ["2023", "2024"], "amounts": [10.0, 5.0]}
+
+    response = auth_client.get("/monthly_spending_data?granularity=year&start=2024-01-01")
+    assert response.get_json() == {"labels": ["2024"], "amounts": [15.0]}
+    assert auth_client.get("/daily_spending_data?granularity=fortnight").status_code == 400
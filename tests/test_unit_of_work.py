@@ -0,0 +1,45 @@
+# tests/test_unit_of_work.py
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.unit_of_work import current_unit_of_work
+from app.views import transaction_routes
+
+
+def _add(client, amount):
+    return client.post("/add_transaction", data={
+        "category": "Food", "payment_method": "UPI", "notes": "",
+        "transaction_type": "expense", "date": "2024-01-15", "amount": amount,
+    })
+
+
+def test_request_writes_are_committed_once_at_the_end(auth_client):
+    _add(auth_client, 12.5)
+    transactions = TransactionRepository().get_by_user_id(auth_client.user_id)
+    assert [t.amount for t in transactions] == [12.5]
+
+
+def test_repositories_share_the_request_connection(app):
+    repository = TransactionRepository()
+    with app.test_request_context("/"):
+        uow = current_unit_of_work()
+        with repository.get_connection() as first, repository.get_connection() as second:
+            assert first is second is uow.connection(repository.db_path)
+
+
+def test_failed_request_is_rolled_back(app, auth_client, monkeypatch):
+    # The view fails after the transaction was written
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(transaction_routes, "flash", fail)
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+
+    assert _add(auth_client, 1).status_code == 500
+    assert TransactionRepository().get_by_user_id(auth_client.user_id) == []
+
+
+def test_delete_is_scoped_to_the_owner(auth_client):
+    repository = TransactionRepository()
+    _add(auth_client, 5)
+    transaction_id = repository.get_by_user_id(auth_client.user_id)[0].id
+
+    assert not repository.delete_for_user(transaction_id, auth_client.user_id + 1)
+    assert repository.delete_for_user(transaction_id, auth_client.user_id)